@@ -0,0 +1,5 @@
+import sys
+
+from spaceGame.gameLaunch import launch
+
+sys.exit(launch())
@@ -0,0 +1,253 @@
+from spaceGame.gameUtil import RESOURCES_PATH
+from spaceGame.gameCollision import Hitbox
+try:
+    from PySide6 import QtCore, QtGui
+except ImportError:
+    from PySide2 import QtCore, QtGui
+
+import os, hashlib, struct, threading
+
+CACHE_PATH = os.path.join(os.path.dirname(RESOURCES_PATH), "cache").replace("\\", "/")
+
+# ----------------------------------------Derived Asset Cache----------------------------------------
+class DiskAssetCache:
+    """On-disk cache of pre-scaled images stored as raw pixel dumps.
+
+    Entries are keyed by source path, mtime, size and target parameters, so editing a source
+    file simply stops matching its old entries; cleanup() drops the least recently used ones
+    once the directory grows past max_bytes. Safe to call from worker threads.
+    """
+
+    MAGIC = b"SGA1"
+    HEADER = struct.Struct("<4sIIII")  # magic, width, height, bytes per line, QImage format
+
+    def __init__(self, path=CACHE_PATH, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.total_bytes = None
+        self.lock = threading.Lock()
+
+    def entryPath(self, source_path, params):
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            return None
+        key = repr((os.path.abspath(source_path), st.st_mtime_ns, st.st_size, params))
+        return os.path.join(self.path, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".img")
+
+    def load(self, source_path, params):
+        entry = self.entryPath(source_path, params) if self.enabled else None
+        if entry is None:
+            return None
+        try:
+            with open(entry, "rb") as f:
+                data = f.read()
+            os.utime(entry)
+        except OSError:
+            return None
+        if len(data) < self.HEADER.size:
+            return None
+        magic, width, height, bytes_per_line, fmt = self.HEADER.unpack_from(data)
+        pixels = data[self.HEADER.size:]
+        if magic != self.MAGIC or len(pixels) != bytes_per_line * height:
+            return None
+        # copy() detaches the image from the bytes buffer it was built on
+        return QtGui.QImage(pixels, width, height, bytes_per_line, QtGui.QImage.Format(fmt)).copy()
+
+    def store(self, source_path, params, image):
+        entry = self.entryPath(source_path, params) if self.enabled else None
+        if entry is None or image.isNull():
+            return
+        fmt = image.format()
+        header = self.HEADER.pack(self.MAGIC, image.width(), image.height(), image.bytesPerLine(), int(getattr(fmt, "value", fmt)))
+        tmp_path = f"{entry}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(header)
+                f.write(bytes(image.constBits()))
+            os.replace(tmp_path, entry)
+        except OSError:
+            # Read-only install location: run without the cache
+            self.enabled = False
+            return
+
+        with self.lock:
+            if self.total_bytes is not None:
+                self.total_bytes += len(header) + image.sizeInBytes()
+            if self.total_bytes is None or self.total_bytes > self.max_bytes:
+                self.cleanup()
+
+    def cleanup(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        try:
+            entries = [e for e in os.scandir(self.path) if e.is_file()]
+        except OSError:
+            self.total_bytes = 0
+            return
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entries]
+        total = sum(size for _, size, _ in stats)
+        for mtime, size, path in sorted(stats):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self.total_bytes = total
+
+    def clear(self):
+        with self.lock:
+            self.cleanup(0)
+
+DISK_CACHE = DiskAssetCache()
+
+def scaledImage(path, width, height, aspect_mode, mode, opacity=1.0):
+    """Decode and scale an image, going through DISK_CACHE so repeat launches skip both steps."""
+    smooth = mode == QtCore.Qt.SmoothTransformation
+    params = (width, height, aspect_mode == QtCore.Qt.KeepAspectRatio, smooth, opacity)
+    image = DISK_CACHE.load(path, params)
+    if image is not None:
+        return image
+    image = QtGui.QImage(path) if os.path.exists(path) else QtGui.QImage()
+    if image.isNull():
+        return image
+    image = image.scaled(width, height, aspect_mode, mode).convertToFormat(QtGui.QImage.Format_ARGB32_Premultiplied)
+    if opacity < 1.0:
+        # Bake the opacity in so the renderer can draw the image without an opacity layer
+        faded = QtGui.QImage(image.size(), QtGui.QImage.Format_ARGB32_Premultiplied)
+        faded.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(faded)
+        painter.setOpacity(opacity)
+        painter.drawImage(0, 0, image)
+        painter.end()
+        image = faded
+    DISK_CACHE.store(path, params, image)
+    return image
+
+# ----------------------------------------Sprite Cache----------------------------------------
+class SpriteCache:
+    """Process-wide cache of scaled icon pixmaps keyed by (icon, size, transform mode).
+
+    Lives across waves and games, so spawning an enemy never touches the disk or re-scales.
+    """
+
+    def __init__(self):
+        self.pixmaps = {}
+        self.hitboxes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def iconPath(self, icon_filename):
+        return os.path.join(RESOURCES_PATH, "icons", icon_filename)
+
+    def get(self, icon_filename, size, mode=QtCore.Qt.SmoothTransformation):
+        key = (icon_filename, size, mode)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            return pixmap
+
+        self.misses += 1
+        image = scaledImage(self.iconPath(icon_filename), size, size, QtCore.Qt.KeepAspectRatio, mode)
+        if not image.isNull():
+            pixmap = QtGui.QPixmap.fromImage(image)
+        else:
+            pixmap = QtGui.QPixmap(size, size)
+        self.pixmaps[key] = pixmap
+        return pixmap
+
+    def hitbox(self, icon_filename, size):
+        # Computed once per (icon, size) from the alpha channel of the scaled sprite
+        key = (icon_filename, size)
+        hitbox = self.hitboxes.get(key)
+        if hitbox is None:
+            if os.path.exists(self.iconPath(icon_filename)):
+                image = self.get(icon_filename, size).toImage()
+                width, height = image.width(), image.height()
+                alpha = [QtGui.qAlpha(image.pixel(x, y)) for y in range(height) for x in range(width)]
+                hitbox = Hitbox.fromAlpha(alpha, width, height)
+            else:
+                hitbox = Hitbox.box(size, size)
+            self.hitboxes[key] = hitbox
+        return hitbox
+
+    def preload(self, sprites, mode=QtCore.Qt.SmoothTransformation):
+        """Decode and scale ahead of time. sprites is an iterable of (icon, size)."""
+        for icon_filename, size in sprites:
+            self.get(icon_filename, size, mode)
+            self.hitbox(icon_filename, size)
+
+    def evict(self, icon_filename=None):
+        """Drop one icon (every size and mode) or, with no argument, everything."""
+        if icon_filename is None:
+            self.pixmaps.clear()
+            self.hitboxes.clear()
+            return
+        for key in [k for k in self.pixmaps if k[0] == icon_filename]:
+            del self.pixmaps[key]
+        for key in [k for k in self.hitboxes if k[0] == icon_filename]:
+            del self.hitboxes[key]
+
+    def stats(self):
+        return {"entries": len(self.pixmaps), "hits": self.hits, "misses": self.misses}
+
+SPRITES = SpriteCache()
+
+# ----------------------------------------Background Images----------------------------------------
+class _DecodeTask(QtCore.QRunnable):
+    def __init__(self, cache, key, path):
+        super().__init__()
+        self.cache = cache
+        self.key = key
+        self.path = path
+
+    def run(self):
+        # QImage is safe off the GUI thread; QPixmap is not, so the cache converts on arrival
+        filename, width, height, opacity = self.key
+        image = scaledImage(self.path, width, height, QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation, opacity)
+        self.cache.decoded.emit(self.key, image)
+
+class BackgroundCache(QtCore.QObject):
+    """Decodes and prescales the big background JPEGs on a worker thread.
+
+    request() returns a key right away; ready(key) fires on the GUI thread once pixmap(key) is available.
+    A non-1.0 opacity is baked into the pixels.
+    """
+
+    decoded = QtCore.Signal(object, object)
+    ready = QtCore.Signal(object)
+
+    def __init__(self, max_threads=2):
+        super().__init__()
+        self.pool = QtCore.QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self.pixmaps = {}
+        self.pending = set()
+        self.decoded.connect(self._onDecoded)
+
+    def request(self, filename, width, height, opacity=1.0):
+        key = (filename, width, height, opacity)
+        if key not in self.pixmaps and key not in self.pending:
+            self.pending.add(key)
+            self.pool.start(_DecodeTask(self, key, os.path.join(RESOURCES_PATH, "images", filename)))
+        return key
+
+    prefetch = request
+
+    def pixmap(self, key):
+        return self.pixmaps.get(key)
+
+    def evict(self, filename=None):
+        for key in [k for k in self.pixmaps if filename is None or k[0] == filename]:
+            del self.pixmaps[key]
+
+    def _onDecoded(self, key, image):
+        self.pending.discard(key)
+        self.pixmaps[key] = QtGui.QPixmap.fromImage(image) if not image.isNull() else None
+        self.ready.emit(key)
+
+BACKGROUNDS = BackgroundCache()
@@ -0,0 +1,301 @@
+"""Headless benchmark of the game loop, run outside Maya on the offscreen Qt platform.
+
+    python -m spaceGame.gameBench --out bench.json
+    python -m spaceGame.gameBench --compare old.json --out new.json
+    python -m spaceGame.gameBench --profile all --no-alloc
+
+Each scenario builds a GameWindow, stops its timer and drives it by hand: one world step
+plus scene sync (tick), then the event loop until the view has repainted (paint, which
+includes the scene's index upkeep and the viewport update). The frame budget is not
+consulted, so every scenario renders at full quality. --profile runs the scenarios under
+other gameRender.RENDER_PROFILES too; those results are keyed "<scenario>@<profile>".
+"""
+import os, sys, json, time, random, argparse, platform, subprocess, tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# Deliver repaints on the next event loop pass instead of after Qt's 5 ms update throttle
+os.environ.setdefault("QT_QPA_UPDATE_IDLE_TIME", "0")
+
+from spaceGame import gameUtil, gameUi
+from spaceGame.gameSim import SCENE_WIDTH
+from spaceGame.gameRender import RENDER_PROFILES
+from spaceGame.gamePerf import percentile
+try:
+    from PySide6 import QtCore, QtWidgets
+except ImportError:
+    from PySide2 import QtCore, QtWidgets
+
+# Keeps the rocket alive and the enemies standing for the whole run
+ENDLESS = {"player_hp": 10 ** 9, "enemy_hp": 10 ** 6}
+
+# ----------------------------------------Pilots----------------------------------------
+def sweep(world, tick, fire_every=3):
+    """Drives left/right across the screen and fires every fire_every ticks."""
+    world.key_left = tick % 100 < 50
+    world.key_right = not world.key_left
+    if fire_every and tick % fire_every == 0:
+        world.fire()
+
+def heldFire(world, tick):
+    """Sweeps with fire held down, shooting as fast as the fire cooldown allows."""
+    world.fire_held = True
+    sweep(world, tick, fire_every=0)
+
+def idle(world, tick):
+    pass
+
+def keepEnemyBullets(count):
+    """Tops the enemy bullet field up to `count` bullets raining from random spots."""
+    def setup(world, tick):
+        field = world.enemy_bullets
+        missing = count - len(field)
+        for i in range(missing):
+            field.emit(random.uniform(0, SCENE_WIDTH), random.uniform(-200, 400), [random.uniform(-1, 1)], [world.enemy_bullet_speed])
+    return setup
+
+def bossAt(fraction):
+    """Puts the boss at `fraction` of its HP so a later emitter phase is active."""
+    def setup(world, tick):
+        if tick == 0:
+            for e in world.enemies:
+                e.hp = max(1, int(e.hp * fraction))
+    return setup
+
+# ----------------------------------------Scenarios----------------------------------------
+def gridScenario(enemies, bullets, render_mode=None):
+    top_up = keepEnemyBullets(bullets)
+
+    def setup(world, tick):
+        # The wave hovers instead of stepping down onto the rocket
+        world.enemy_step_down = 0
+        top_up(world, tick)
+
+    return {
+        "name": f"grid_{enemies}x{bullets}" + (f"_{render_mode}" if render_mode else ""),
+        "difficulty": "Hard",
+        "overrides": dict(ENDLESS, enemies_per_wave=enemies),
+        "render_mode": render_mode,
+        "pilot": idle,
+        "setup": setup,
+    }
+
+SCENARIOS = [
+    gridScenario(10, 100),
+    gridScenario(100, 1000),
+    gridScenario(100, 1000, "batch"),
+    gridScenario(400, 5000, "batch"),
+    {"name": "boss_fan", "difficulty": "Goddamn", "overrides": dict(ENDLESS), "pilot": idle},
+    {"name": "boss_spiral", "difficulty": "Goddamn", "overrides": dict(ENDLESS), "pilot": idle, "setup": bossAt(0.25)},
+    # The enemy-bullet target: 10k bullets on screen in one frame budget
+    {"name": "boss_10k_batch", "difficulty": "Goddamn", "overrides": dict(ENDLESS), "render_mode": "batch",
+     "pilot": idle, "setup": keepEnemyBullets(10000)},
+    {"name": "held_fire", "difficulty": "Normal", "overrides": dict(ENDLESS), "pilot": heldFire},
+] + [
+    {"name": f"difficulty_{difficulty}", "difficulty": difficulty, "overrides": {"player_hp": 10 ** 9}, "pilot": sweep}
+    for difficulty in gameUtil.DIFFICULT
+]
+
+# ----------------------------------------Running----------------------------------------
+def summary(values):
+    return {
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values, default=0.0), 4),
+        "mean": round(sum(values) / len(values), 4) if values else 0.0,
+    }
+
+def openWindow(scenario, seed, profile="default"):
+    window = gameUi.GameWindow("Bench", scenario["difficulty"], render_mode=scenario.get("render_mode"),
+                               seed=seed, render_profile=profile, **scenario.get("overrides", {}))
+    window.stopTimers()
+    window.show()
+    # Give the background decode a moment so paints include it
+    deadline = time.perf_counter() + 2.0
+    while window.shown_bg_key != window.bg_key and time.perf_counter() < deadline:
+        QtWidgets.QApplication.processEvents()
+        time.sleep(0.005)
+    return window
+
+def closeWindow(window):
+    window.close()
+    window.deleteLater()
+    QtWidgets.QApplication.processEvents()
+
+def drive(window, scenario, ticks, on_tick=None):
+    """Runs up to `ticks` frames; on_tick(tick, tick_ms, paint_ms) is called after each one."""
+    world = window.world
+    view = window.view
+    pilot = scenario.get("pilot", idle)
+    setup = scenario.get("setup")
+    tick = 0
+    while tick < ticks and world.state == "playing":
+        if setup is not None:
+            setup(world, tick)
+        pilot(world, tick)
+
+        start = time.perf_counter()
+        world.step()
+        window.syncScene()
+        painted = time.perf_counter()
+        # Scene changes reach the view through queued events; a frame where nothing moved
+        # gives up after a few passes instead of waiting for a paint that never comes
+        for attempt in range(3):
+            QtWidgets.QApplication.processEvents()
+            if view.painted_at >= painted:
+                break
+        end = time.perf_counter()
+
+        if on_tick is not None:
+            on_tick(tick, (painted - start) * 1000.0, (end - painted) * 1000.0)
+        tick += 1
+    return tick
+
+def runScenario(scenario, ticks=600, seed=1, allocations=True, profile="default"):
+    """Timed pass, then (optionally) the same run again under tracemalloc."""
+    random.seed(seed)
+    window = openWindow(scenario, seed, profile)
+    tick_ms = []
+    paint_ms = []
+    peak = {"items": 0, "enemy_bullets": 0}
+
+    def record(tick, tick_cost, paint_cost):
+        tick_ms.append(tick_cost)
+        paint_ms.append(paint_cost)
+        peak["items"] = max(peak["items"], len(window.scene.items()))
+        peak["enemy_bullets"] = max(peak["enemy_bullets"], len(window.world.enemy_bullets))
+
+    ran = drive(window, scenario, ticks, record)
+    result = {
+        "difficulty": scenario["difficulty"],
+        "render_mode": window.render_mode,
+        "profile": profile,
+        "ticks": ran,
+        "state": window.world.state,
+        "tick_ms": summary(tick_ms),
+        "paint_ms": summary(paint_ms),
+        "frame_ms": summary([t + p for t, p in zip(tick_ms, paint_ms)]),
+        "peak_scene_items": peak["items"],
+        "peak_enemy_bullets": peak["enemy_bullets"],
+        "pools": window.poolStats(),
+    }
+    closeWindow(window)
+
+    if allocations:
+        random.seed(seed)
+        window = openWindow(scenario, seed, profile)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        ran = drive(window, scenario, ticks)
+        after = tracemalloc.take_snapshot()
+        current, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        growth = after.compare_to(before, "filename")
+        result["allocations"] = {
+            "net_kb": round(sum(stat.size_diff for stat in growth) / 1024.0, 1),
+            "net_blocks": sum(stat.count_diff for stat in growth),
+            "peak_kb": round(peak_bytes / 1024.0, 1),
+            "top": [{"file": os.path.basename(stat.traceback[0].filename), "kb": round(stat.size_diff / 1024.0, 1)}
+                    for stat in growth[:5]],
+        }
+        closeWindow(window)
+    return result
+
+def revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def runAll(names=None, ticks=600, seed=1, allocations=True, log=print, profiles=("default",)):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    report = {
+        "revision": revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "qt": QtCore.qVersion(),
+        "platform": platform.platform(),
+        "ticks": ticks,
+        "seed": seed,
+        "scenarios": {},
+        "profiles": {},
+    }
+    for profile in profiles:
+        frame_p50 = []
+        frame_p95 = []
+        for scenario in SCENARIOS:
+            if names and scenario["name"] not in names:
+                continue
+            name = scenario["name"] if profile == "default" else f"{scenario['name']}@{profile}"
+            result = runScenario(scenario, ticks, seed, allocations, profile)
+            report["scenarios"][name] = result
+            frame_p50.append(result["frame_ms"]["p50"])
+            frame_p95.append(result["frame_ms"]["p95"])
+            log(f"{name:<32} ticks {result['ticks']:>4}  tick p50/p95/p99 "
+                f"{result['tick_ms']['p50']:.2f}/{result['tick_ms']['p95']:.2f}/{result['tick_ms']['p99']:.2f} ms  "
+                f"paint p95 {result['paint_ms']['p95']:.2f} ms  items {result['peak_scene_items']}")
+        if frame_p95:
+            # Mean over the scenarios, to pick a profile for this machine at a glance
+            report["profiles"][profile] = {
+                "frame_p50": round(sum(frame_p50) / len(frame_p50), 4),
+                "frame_p95": round(sum(frame_p95) / len(frame_p95), 4),
+            }
+    if len(report["profiles"]) > 1:
+        for profile, frames in report["profiles"].items():
+            log(f"profile {profile:<10} mean frame p50 {frames['frame_p50']:.2f} ms  p95 {frames['frame_p95']:.2f} ms")
+    return report
+
+# ----------------------------------------Comparing----------------------------------------
+def compare(old, new, threshold=0.10, log=print):
+    """Prints p95 frame-time changes per scenario. Returns the scenarios slower by more than threshold."""
+    regressions = []
+    for name, result in new["scenarios"].items():
+        before = old.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        was = before["frame_ms"]["p95"]
+        now = result["frame_ms"]["p95"]
+        change = (now - was) / was if was else 0.0
+        log(f"{name:<32} frame p95 {was:.2f} -> {now:.2f} ms ({change:+.0%})")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Space Invader benchmark")
+    parser.add_argument("--out", default="bench.json", help="JSON report path")
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenario", action="append", help="only run these scenarios (repeatable)")
+    parser.add_argument("--no-alloc", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--compare", help="previous report to compare p95 frame times against")
+    parser.add_argument("--profile", action="append", choices=sorted(RENDER_PROFILES) + ["all"],
+                        help="render profile to run under (repeatable, default: default)")
+    parser.add_argument("--list", action="store_true", help="list scenario names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for scenario in SCENARIOS:
+            print(scenario["name"])
+        return 0
+
+    profiles = args.profile or ["default"]
+    if "all" in profiles:
+        profiles = list(RENDER_PROFILES)
+    report = runAll(args.scenario, args.ticks, args.seed, not args.no_alloc, profiles=profiles)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report)
+        if regressions:
+            print("Slower: " + ", ".join(regressions))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+import math
+
+from spaceGame.gameUtil import HAS_NUMPY, loadNumpy
+
+# Set by the first NumpyBulletField (see gameUtil.loadNumpy)
+np = None
+
+# ----------------------------------------Patterns----------------------------------------
+# Velocities are in px per simulation step, scaled by the difficulty's enemy_bullet_speed.
+#   fan:    dx offsets spread evenly over `spread`, dy = 1 (the original boss fan)
+#   ring:   `count` bullets evenly around a circle
+#   spiral: `arms` bullets around a circle, rotated by `spin` radians every time it fires
+#   aimed:  `count` bullets towards the rocket, `spread` radians apart
+# `chance` makes every emitter roll before firing; `speed` is a multiplier.
+PATTERNS = {
+    "single": {"kind": "fan", "count": 1, "spread": 0.0, "chance": 0.3},
+    "swarm_single": {"kind": "fan", "count": 1, "spread": 0.0, "chance": 0.01},
+    "fan5": {"kind": "fan", "count": 5, "spread": 1.0},
+    "ring24": {"kind": "ring", "count": 24, "speed": 0.6},
+    "spiral6": {"kind": "spiral", "arms": 6, "spin": 0.3, "speed": 0.7},
+    "aimed3": {"kind": "aimed", "count": 3, "spread": 0.25, "speed": 1.2},
+}
+
+def patternVelocities(pattern, speed, origin, target, spin=0.0):
+    """Expand one pattern into (vx, vy) lists for a single emitter."""
+    speed *= pattern.get("speed", 1.0)
+    kind = pattern["kind"]
+    if kind == "fan":
+        count = pattern["count"]
+        spread = pattern["spread"]
+        offsets = [spread * (i / (count - 1) - 0.5) for i in range(count)] if count > 1 else [0.0]
+        return [dx * speed for dx in offsets], [speed] * count
+    if kind == "aimed":
+        base = math.atan2(target[1] - origin[1], target[0] - origin[0])
+        count = pattern["count"]
+        angles = [base + pattern["spread"] * (i - (count - 1) / 2.0) for i in range(count)]
+    else:
+        count = pattern["count"] if kind == "ring" else pattern["arms"]
+        angles = [spin + 2 * math.pi * i / count for i in range(count)]
+    return [math.cos(a) * speed for a in angles], [math.sin(a) * speed for a in angles]
+
+# ----------------------------------------Emitter Schedule----------------------------------------
+class EmitterSchedule:
+    """Plays the difficulty's bullet phases in simulation time.
+
+    phases is a list of {"hp_below": fraction, "sequence": [(delay_ms, pattern), ...]}; the
+    last phase whose hp_below is >= the enemies' remaining HP fraction is active, and its
+    sequence loops, each entry firing delay_ms after the previous one. Every delay_ms must
+    be > 0, otherwise a looping sequence would never let advance() return.
+    """
+
+    def __init__(self, phases):
+        for index, phase in enumerate(phases):
+            if not phase["sequence"]:
+                raise ValueError(f"bullet phase {index} has an empty sequence")
+            for delay, name in phase["sequence"]:
+                if not delay > 0:
+                    raise ValueError(f"bullet phase {index}: delay_ms of {name!r} must be > 0, got {delay!r}")
+        self.phases = phases
+        self.phase = 0
+        self.cursor = 0
+        self.clock = 0.0
+        self.spin = 0.0
+
+    def activePhase(self, hp_fraction):
+        phase = 0
+        for i, p in enumerate(self.phases):
+            if hp_fraction <= p["hp_below"]:
+                phase = i
+        return phase
+
+    def advance(self, elapsed_ms, hp_fraction):
+        """Returns the pattern names due in this step."""
+        phase = self.activePhase(hp_fraction)
+        if phase != self.phase:
+            self.phase = phase
+            self.cursor = 0
+            self.clock = 0.0
+        sequence = self.phases[phase]["sequence"]
+        due = []
+        self.clock += elapsed_ms
+        while self.clock >= sequence[self.cursor][0]:
+            delay, name = sequence[self.cursor]
+            self.clock -= delay
+            self.cursor = (self.cursor + 1) % len(sequence)
+            due.append(name)
+        return due
+
+    def current(self):
+        return self.phases[self.phase]["sequence"][self.cursor][1]
+
+# ----------------------------------------Bullet Field----------------------------------------
+class NumpyBulletField:
+    """Struct-of-arrays bullet storage: x, y, vx, vy, alive (+ previous positions).
+
+    Live bullets are kept dense in [0, n); step() advances, culls and compacts them in
+    a handful of vectorised operations.
+    """
+
+    def __init__(self, capacity=256, width=5, height=15, color="red"):
+        global np
+        np = loadNumpy()
+        self.width = width
+        self.height = height
+        self.color = color
+        self.n = 0
+        self.high_water = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = getattr(self, "x", None)
+        self.capacity = capacity
+        arrays = {}
+        for name in ("x", "y", "prev_x", "prev_y", "vx", "vy"):
+            arrays[name] = np.zeros(capacity)
+        arrays["alive"] = np.zeros(capacity, dtype=bool)
+        if old is not None:
+            for name, array in arrays.items():
+                array[:self.n] = getattr(self, name)[:self.n]
+        self.__dict__.update(arrays)
+
+    def __len__(self):
+        return self.n
+
+    def emit(self, x, y, vxs, vys):
+        count = len(vxs)
+        end = self.n + count
+        if end > self.capacity:
+            self._allocate(max(end, self.capacity * 2))
+        n = self.n
+        self.x[n:end] = x
+        self.y[n:end] = y
+        self.prev_x[n:end] = x
+        self.prev_y[n:end] = y
+        self.vx[n:end] = vxs
+        self.vy[n:end] = vys
+        self.alive[n:end] = True
+        self.n = end
+        self.high_water = max(self.high_water, end)
+
+    def step(self, left, top, right, bottom):
+        n = self.n
+        x, y = self.x[:n], self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += self.vx[:n]
+        y += self.vy[:n]
+        self.alive[:n] = (x > left) & (x < right) & (y > top) & (y < bottom)
+        self.compact()
+
+    def hitRect(self, left, top, right, bottom):
+        n = self.n
+        x, y = self.x[:n], self.y[:n]
+        return np.nonzero((x < right) & (left < x + self.width) & (y < bottom) & (top < y + self.height))[0].tolist()
+
+    def remove(self, indices):
+        self.alive[indices] = False
+        self.compact()
+
+    def compact(self):
+        n = self.n
+        keep = self.alive[:n]
+        count = int(keep.sum())
+        if count != n:
+            for name in ("x", "y", "prev_x", "prev_y", "vx", "vy"):
+                array = getattr(self, name)
+                array[:count] = array[:n][keep]
+            self.alive[:count] = True
+            self.alive[count:n] = False
+            self.n = count
+
+    def positions(self, alpha=1.0):
+        xs, ys = self.arrays(alpha)
+        return xs.tolist(), ys.tolist()
+
+    def arrays(self, alpha=1.0):
+        """positions() as numpy arrays, for callers that stay vectorised."""
+        n = self.n
+        return (self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha,
+                self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha)
+
+    def clear(self):
+        self.alive[:self.n] = False
+        self.n = 0
+
+    def stats(self):
+        return {"capacity": self.capacity, "active": self.n, "high_water": self.high_water}
+
+class ListBulletField:
+    """Same interface as NumpyBulletField on plain lists, for hosts without numpy."""
+
+    def __init__(self, capacity=256, width=5, height=15, color="red"):
+        self.width = width
+        self.height = height
+        self.color = color
+        self.capacity = capacity
+        self.high_water = 0
+        self.clear()
+
+    def __len__(self):
+        return len(self.x)
+
+    def emit(self, x, y, vxs, vys):
+        count = len(vxs)
+        self.x.extend([x] * count)
+        self.y.extend([y] * count)
+        self.prev_x.extend([x] * count)
+        self.prev_y.extend([y] * count)
+        self.vx.extend(vxs)
+        self.vy.extend(vys)
+        self.alive.extend([True] * count)
+        self.capacity = max(self.capacity, len(self.x))
+        self.high_water = max(self.high_water, len(self.x))
+
+    def step(self, left, top, right, bottom):
+        x, y, vx, vy, alive = self.x, self.y, self.vx, self.vy, self.alive
+        self.prev_x = x[:]
+        self.prev_y = y[:]
+        for i in range(len(x)):
+            nx = x[i] = x[i] + vx[i]
+            ny = y[i] = y[i] + vy[i]
+            alive[i] = left < nx < right and top < ny < bottom
+        self.compact()
+
+    def hitRect(self, left, top, right, bottom):
+        w, h = self.width, self.height
+        return [i for i, (x, y) in enumerate(zip(self.x, self.y))
+                if x < right and left < x + w and y < bottom and top < y + h]
+
+    def remove(self, indices):
+        for i in indices:
+            self.alive[i] = False
+        self.compact()
+
+    def compact(self):
+        alive = self.alive
+        if all(alive):
+            return
+        for name in ("x", "y", "prev_x", "prev_y", "vx", "vy"):
+            setattr(self, name, [v for v, keep in zip(getattr(self, name), alive) if keep])
+        self.alive = [True] * len(self.x)
+
+    def positions(self, alpha=1.0):
+        if alpha == 1.0:
+            return self.x[:], self.y[:]
+        return ([px + (x - px) * alpha for px, x in zip(self.prev_x, self.x)],
+                [py + (y - py) * alpha for py, y in zip(self.prev_y, self.y)])
+
+    def clear(self):
+        self.x, self.y, self.prev_x, self.prev_y, self.vx, self.vy, self.alive = [], [], [], [], [], [], []
+
+    def stats(self):
+        return {"capacity": self.capacity, "active": len(self.x), "high_water": self.high_water}
+
+BulletField = NumpyBulletField if HAS_NUMPY else ListBulletField
@@ -0,0 +1,159 @@
+# ----------------------------------------Hitboxes----------------------------------------
+ALPHA_THRESHOLD = 32
+
+class Hitbox:
+    """Sprite-local AABB of the opaque pixels, plus optional per-row opacity bitmasks."""
+
+    __slots__ = ("left", "top", "right", "bottom", "rows")
+
+    def __init__(self, left, top, right, bottom, rows=None):
+        self.left = left
+        self.top = top
+        self.right = right
+        self.bottom = bottom
+        # rows[y] has bit x set when pixel (x, y) is opaque
+        self.rows = rows
+
+    @classmethod
+    def box(cls, width, height):
+        return cls(0, 0, width, height)
+
+    @classmethod
+    def fromRows(cls, rows, width):
+        opaque = [y for y, bits in enumerate(rows) if bits]
+        if not opaque:
+            return cls.box(width, len(rows))
+        left = width
+        right = 0
+        for y in opaque:
+            bits = rows[y]
+            left = min(left, (bits & -bits).bit_length() - 1)
+            right = max(right, bits.bit_length())
+        return cls(left, opaque[0], right, opaque[-1] + 1, rows)
+
+    @classmethod
+    def fromAlpha(cls, alpha, width, height, threshold=ALPHA_THRESHOLD):
+        """Build from a row-major sequence of alpha values (0-255)."""
+        rows = []
+        for y in range(height):
+            bits = 0
+            base = y * width
+            for x in range(width):
+                if alpha[base + x] >= threshold:
+                    bits |= 1 << x
+            rows.append(bits)
+        return cls.fromRows(rows, width)
+
+    def maskHit(self, x, y, width, height):
+        """Pixel test of a sprite-local rect against the opacity mask."""
+        rows = self.rows
+        if rows is None:
+            return True
+        y0 = max(int(y), 0)
+        y1 = min(int(y + height + 0.999), len(rows))
+        x0 = max(int(x), 0)
+        x1 = int(x + width + 0.999)
+        if y0 >= y1 or x0 >= x1:
+            return False
+        span = ((1 << (x1 - x0)) - 1) << x0
+        for row in range(y0, y1):
+            if rows[row] & span:
+                return True
+        return False
+
+# ----------------------------------------Narrowphase----------------------------------------
+def overlaps(a, b):
+    return (a.x < b.x + b.width and b.x < a.x + a.width and
+            a.y < b.y + b.height and b.y < a.y + a.height)
+
+def hits(rect, target, pixel_perfect=False):
+    """Plain rect (a bullet) against an entity carrying a Hitbox."""
+    hb = target.hitbox
+    tx = target.x
+    ty = target.y
+    if not (rect.x < tx + hb.right and tx + hb.left < rect.x + rect.width and
+            rect.y < ty + hb.bottom and ty + hb.top < rect.y + rect.height):
+        return False
+    if pixel_perfect:
+        return hb.maskHit(rect.x - tx, rect.y - ty, rect.width, rect.height)
+    return True
+
+# ----------------------------------------Broadphase----------------------------------------
+GRID_CELL_SIZE = 50
+
+class SpatialHash:
+    """Uniform grid over the scene. Entities are re-bucketed only when they cross a cell edge."""
+
+    def __init__(self, cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        # (cx, cy) -> {entity: None}; dicts keep insertion order so queries stay deterministic
+        self.cells = {}
+        # entity -> (cx0, cy0, cx1, cy1)
+        self.spans = {}
+
+    def __len__(self):
+        return len(self.spans)
+
+    def __contains__(self, entity):
+        return entity in self.spans
+
+    def span(self, x, y, width, height):
+        size = self.cell_size
+        return (int(x // size), int(y // size),
+                int((x + width) // size), int((y + height) // size))
+
+    def insert(self, entity):
+        span = self.span(entity.x, entity.y, entity.width, entity.height)
+        self.spans[entity] = span
+        self._link(entity, span)
+
+    def remove(self, entity):
+        span = self.spans.pop(entity, None)
+        if span is not None:
+            self._unlink(entity, span)
+
+    def move(self, entity):
+        span = self.span(entity.x, entity.y, entity.width, entity.height)
+        old = self.spans[entity]
+        if span != old:
+            self._unlink(entity, old)
+            self.spans[entity] = span
+            self._link(entity, span)
+
+    def query(self, x, y, width, height):
+        cx0, cy0, cx1, cy1 = self.span(x, y, width, height)
+        cells = self.cells
+        if cx0 == cx1 and cy0 == cy1:
+            bucket = cells.get((cx0, cy0))
+            return list(bucket) if bucket else []
+        found = {}
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return list(found)
+
+    def clear(self):
+        self.cells.clear()
+        self.spans.clear()
+
+    def _link(self, entity, span):
+        cx0, cy0, cx1, cy1 = span
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    bucket = cells[(cx, cy)] = {}
+                bucket[entity] = None
+
+    def _unlink(self, entity, span):
+        cx0, cy0, cx1, cy1 = span
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells[(cx, cy)]
+                del bucket[entity]
+                if not bucket:
+                    del cells[(cx, cy)]
@@ -0,0 +1,221 @@
+"""Plays thousands of headless games across all cores to balance the difficulty table.
+
+    python -m spaceGame.gameFarm --difficulty Normal --games 500
+    python -m spaceGame.gameFarm --difficulty Hard --pilot tracker --param speed_enemy=1,2,3 \\
+        --param enemy_hp=1,2 --param shoot_scale=0.5,1 --out farm.json
+
+Each --param sweeps one difficulty setting over comma-separated JSON values; every
+combination of the grid is played --games times with seeds base_seed + i. shoot_scale
+is a farm-only knob that multiplies every delay in the difficulty's bullet_phases.
+Without --hitboxes (a saved replay to borrow sprite masks from) sprites collide as boxes.
+"""
+import os, sys, json, time, argparse, itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from spaceGame.gameSim import GameWorld, difficultySettings, SCENE_WIDTH, SCENE_HEIGHT
+from spaceGame.gamePerf import percentile
+from spaceGame import gameReplay
+
+# ----------------------------------------Pilots----------------------------------------
+# pilot(world, tick) sets the keys and fires, like a player between two steps
+FIRE_EVERY = 6
+
+def idlePilot(world, tick):
+    if tick % FIRE_EVERY == 0:
+        world.fire()
+
+def sweepPilot(world, tick):
+    world.key_left = tick // 80 % 2 == 0
+    world.key_right = not world.key_left
+    if tick % FIRE_EVERY == 0:
+        world.fire()
+
+def targetX(world):
+    """Centre x of the lowest enemy, the one that ends the game first."""
+    swarm = world.swarm
+    if swarm is not None:
+        visible = swarm.visible(SCENE_HEIGHT)
+        if not len(visible):
+            return None
+        lowest = visible[swarm.y[visible].argmax()]
+        return float(swarm.x[lowest]) + swarm.size / 2
+    if not world.enemies:
+        return None
+    lowest = max(world.enemies, key=lambda e: e.y)
+    return lowest.x + lowest.width / 2
+
+def trackerPilot(world, tick):
+    """Dodges enemy bullets about to land on it, otherwise lines up under the lowest enemy."""
+    rocket = world.rocket
+    centre = rocket.x + rocket.width / 2
+    move = 0
+
+    xs, ys = world.enemy_bullets.positions()
+    threat = None
+    for x, y in zip(xs, ys):
+        if rocket.y - 120 < y < rocket.y + rocket.height and abs(x - centre) < rocket.width:
+            if threat is None or y > threat[1]:
+                threat = (x, y)
+    if threat is not None:
+        move = 1 if threat[0] < centre else -1
+        # Walled in: dodge the other way
+        if (move < 0 and rocket.x <= 0) or (move > 0 and rocket.x + rocket.width >= SCENE_WIDTH):
+            move = -move
+    else:
+        target = targetX(world)
+        if target is not None and abs(target - centre) > 4:
+            move = 1 if target > centre else -1
+
+    world.key_left = move < 0
+    world.key_right = move > 0
+    target = targetX(world)
+    if tick % FIRE_EVERY == 0 and target is not None and abs(target - centre) < 25:
+        world.fire()
+
+PILOTS = {"idle": idlePilot, "sweep": sweepPilot, "tracker": trackerPilot}
+
+# ----------------------------------------Games----------------------------------------
+def farmSettings(difficulty, params):
+    """Turns a grid point into GameWorld overrides, expanding the farm-only knobs."""
+    overrides = dict(params)
+    scale = overrides.pop("shoot_scale", None)
+    if scale is not None:
+        phases = difficultySettings(difficulty)["bullet_phases"]
+        overrides["bullet_phases"] = [
+            dict(phase, sequence=[(delay * scale, name) for delay, name in phase["sequence"]])
+            for phase in phases
+        ]
+    return overrides
+
+def playGame(difficulty, overrides, pilot, seed, max_ticks, hitboxes=None):
+    world = GameWorld(difficulty, "Farm", hitboxes=hitboxes, seed=seed, **overrides)
+    drive = PILOTS[pilot]
+    while world.state == "playing" and world.ticks < max_ticks:
+        drive(world, world.ticks)
+        world.step()
+    return {
+        "state": world.state if world.state != "playing" else "timeout",
+        "ticks": world.ticks,
+        "seconds": world.ticks * world.step_ms / 1000.0,
+        "score": world.score,
+        "player_hp": world.player_hp,
+    }
+
+def playBatch(job):
+    """Worker entry point: one grid point, a run of seeds. Batching keeps IPC off the hot path."""
+    point, difficulty, params, pilot, seeds, max_ticks, hitbox_path = job
+    hitboxes = gameReplay.hitboxesFrom(gameReplay.load(hitbox_path)) if hitbox_path else None
+    overrides = farmSettings(difficulty, params)
+    return point, [playGame(difficulty, overrides, pilot, seed, max_ticks, hitboxes) for seed in seeds]
+
+# ----------------------------------------Aggregation----------------------------------------
+def quantiles(values, points=(10, 50, 90)):
+    return {f"p{p}": percentile(values, p, None) for p in points}
+
+def aggregate(games):
+    wins = [g for g in games if g["state"] == "won"]
+    scores = [g["score"] for g in games]
+    kill_times = [g["seconds"] for g in wins]
+    summary = {
+        "games": len(games),
+        "win_rate": round(len(wins) / len(games), 4) if games else 0.0,
+        "timeout_rate": round(sum(g["state"] == "timeout" for g in games) / len(games), 4) if games else 0.0,
+        "time_to_kill_s": dict(quantiles(kill_times), mean=round(sum(kill_times) / len(kill_times), 2) if kill_times else None),
+        "score": dict(quantiles(scores), mean=round(sum(scores) / len(scores), 1) if scores else None),
+        "hp_left_on_win": round(sum(g["player_hp"] for g in wins) / len(wins), 2) if wins else None,
+    }
+    # Coarse histogram so score distributions can be eyeballed without the raw games
+    if scores:
+        width = max(1, (max(scores) - min(scores)) // 10 + 1)
+        histogram = {}
+        for score in scores:
+            bucket = min(scores) + (score - min(scores)) // width * width
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+        summary["score_histogram"] = {str(k): v for k, v in sorted(histogram.items())}
+    return summary
+
+def parseParams(specs):
+    """["speed_enemy=1,2"] -> {"speed_enemy": [1, 2]}; values are JSON, bare words are strings."""
+    grid = {}
+    for spec in specs or []:
+        name, _, values = spec.partition("=")
+        parsed = []
+        for value in values.split(","):
+            try:
+                parsed.append(json.loads(value))
+            except ValueError:
+                parsed.append(value)
+        grid[name.strip()] = parsed
+    return grid
+
+def gridPoints(grid):
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def runFarm(difficulties, grid, pilot="tracker", games=100, max_ticks=20000, seed=0, workers=None,
+            batch=25, hitbox_path=None, log=print):
+    points = [(difficulty, params) for difficulty in difficulties for params in gridPoints(grid)]
+    jobs = []
+    for index, (difficulty, params) in enumerate(points):
+        for start in range(0, games, batch):
+            seeds = list(range(seed + start, seed + min(games, start + batch)))
+            jobs.append((index, difficulty, params, pilot, seeds, max_ticks, hitbox_path))
+
+    results = [[] for _ in points]
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for point, played in map(playBatch, jobs):
+            results[point].extend(played)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for point, played in pool.map(playBatch, jobs):
+                results[point].extend(played)
+    elapsed = time.perf_counter() - started
+
+    total_games = sum(len(r) for r in results)
+    total_ticks = sum(g["ticks"] for r in results for g in r)
+    report = {
+        "pilot": pilot,
+        "games_per_point": games,
+        "max_ticks": max_ticks,
+        "seed": seed,
+        "workers": workers,
+        "elapsed_s": round(elapsed, 2),
+        "games_per_s": round(total_games / elapsed, 1) if elapsed else 0.0,
+        "ticks_per_s": round(total_ticks / elapsed) if elapsed else 0,
+        "points": [],
+    }
+    for (difficulty, params), played in zip(points, results):
+        summary = aggregate(played)
+        report["points"].append(dict(summary, difficulty=difficulty, params=params))
+        log(f"{difficulty:<8} {json.dumps(params):<40} win {summary['win_rate']:6.1%}  "
+            f"ttk p50 {summary['time_to_kill_s']['p50'] or 0:6.1f} s  score p50 {summary['score']['p50']}")
+    log(f"{total_games} games, {total_ticks} ticks in {elapsed:.1f} s on {workers} workers "
+        f"({report['games_per_s']} games/s)")
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless difficulty-balancing farm")
+    parser.add_argument("--difficulty", action="append", help="difficulty to play (repeatable, default all but Swarm)")
+    parser.add_argument("--param", action="append", help="setting=v1,v2,... to sweep (repeatable)")
+    parser.add_argument("--pilot", default="tracker", choices=sorted(PILOTS))
+    parser.add_argument("--games", type=int, default=100, help="games per grid point")
+    parser.add_argument("--max-ticks", type=int, default=20000, help="games still running after this count as timeouts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="processes, default one per core")
+    parser.add_argument("--batch", type=int, default=25, help="games per worker task")
+    parser.add_argument("--hitboxes", help="saved replay whose sprite masks to collide with")
+    parser.add_argument("--out", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    difficulties = args.difficulty or ["Easy", "Normal", "Hard", "Goddamn"]
+    report = runFarm(difficulties, parseParams(args.param), args.pilot, args.games, args.max_ticks,
+                     args.seed, args.workers, args.batch, args.hitboxes)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Starts the game inside Maya or as a standalone Qt application.
+
+    Maya:       from spaceGame import gameLaunch; gameLaunch.launch()
+    Standalone: python -m spaceGame
+
+Startup is timed (Qt import, package import, menu construction, first paint of the menu)
+and printed; the numbers of the last launch stay in STARTUP.
+"""
+import sys, time
+
+_started = time.perf_counter()
+try:
+    from PySide6 import QtCore, QtWidgets
+except ImportError:
+    from PySide2 import QtCore, QtWidgets
+_qt_imported = time.perf_counter()
+
+STARTUP = {}
+
+class FirstPaintFilter(QtCore.QObject):
+    """Calls back with the elapsed ms when the watched widget is painted for the first time."""
+
+    def __init__(self, widget, started, callback):
+        super().__init__(widget)
+        self.started = started
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint:
+            obj.removeEventFilter(self)
+            self.callback((time.perf_counter() - self.started) * 1000.0)
+        return False
+
+def report(timings):
+    STARTUP.clear()
+    STARTUP.update(timings)
+    print("[spaceGame] startup " + ", ".join(f"{name} {ms:.1f} ms" for name, ms in timings.items()))
+
+def launch(argv=None):
+    """Shows the main menu. Standalone (no QApplication yet) it also runs the event loop
+    and returns its exit code; inside Maya it returns right away."""
+    started = time.perf_counter()
+    app = QtWidgets.QApplication.instance()
+    standalone = app is None
+    if standalone:
+        app = QtWidgets.QApplication(sys.argv if argv is None else argv)
+    app_ready = time.perf_counter()
+
+    from spaceGame import gameUi
+    imported = time.perf_counter()
+
+    gameUi.showMainMenu()
+    shown = time.perf_counter()
+
+    timings = {
+        "qt_import": (_qt_imported - _started) * 1000.0,
+        "app": (app_ready - started) * 1000.0,
+        "import": (imported - app_ready) * 1000.0,
+        "menu": (shown - imported) * 1000.0,
+    }
+
+    def firstPaint(ms):
+        timings["first_paint"] = ms
+        report(timings)
+
+    FirstPaintFilter(gameUi.ui, started, firstPaint)
+    if standalone:
+        code = app.exec() if hasattr(app, "exec") else app.exec_()
+        # Let the last score and replay reach the disk before the process goes away
+        from spaceGame.gameScores import SCORES
+        SCORES.wait()
+        gameUi.REPLAYS.wait()
+        return code
+    return 0
@@ -0,0 +1,217 @@
+import os, csv, json, math, time, collections, tracemalloc
+
+# ----------------------------------------Statistics----------------------------------------
+def percentile(values, p, default=0.0):
+    """Nearest-rank percentile (the smallest value with at least p% of values at or below it).
+    Shared by the HUD, gameBench and gameFarm so their pNN numbers mean the same thing."""
+    if not values:
+        return default
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100.0 * len(ordered)) - 1))]
+
+# ----------------------------------------Frame Budget----------------------------------------
+QUALITY_LEVELS = [
+    "full",
+    "fast_transform",     # FastTransformation instead of SmoothTransformation
+    "no_hp_labels",       # hide the per-enemy hpLabel text
+    "flat_background",    # skip the background image, flat colour only
+    "low_render_rate",    # render at half rate, simulation stays at full rate
+]
+
+class FrameBudget:
+    """Tracks tick + paint cost per frame and steps the quality level down/up.
+
+    Steps down when the average over the last `window` frames is over budget_ms,
+    steps back up once it has stayed below recover_ratio * budget_ms for a full window.
+    """
+
+    def __init__(self, budget_ms=16.0, window=30, recover_ratio=0.6):
+        self.budget_ms = budget_ms
+        self.window = window
+        self.recover_ratio = recover_ratio
+        self.level = 0
+        self.samples = []
+        self.last_tick_ms = 0.0
+        self.last_paint_ms = 0.0
+
+    def levelName(self):
+        return QUALITY_LEVELS[self.level]
+
+    def record(self, tick_ms, paint_ms):
+        """Add one frame. Returns the new level when it changed, otherwise None."""
+        self.last_tick_ms = tick_ms
+        self.last_paint_ms = paint_ms
+        self.samples.append(tick_ms + paint_ms)
+        if len(self.samples) < self.window:
+            return None
+
+        average = sum(self.samples) / len(self.samples)
+        self.samples = []
+        if average > self.budget_ms and self.level < len(QUALITY_LEVELS) - 1:
+            self.level += 1
+            return self.level
+        if average < self.budget_ms * self.recover_ratio and self.level > 0:
+            self.level -= 1
+            return self.level
+        return None
+
+    def reset(self):
+        self.level = 0
+        self.samples = []
+
+# ----------------------------------------Metrics----------------------------------------
+METRIC_FIELDS = [
+    "time",
+    "frame_ms",       # wall time since the previous frame
+    "tick_ms",        # simulation steps + scene sync
+    "paint_ms",       # last view repaint
+    "jitter_ms",      # |frame_ms - timer interval|
+    "steps",          # simulation steps run this frame
+    "player_bullets",
+    "enemy_bullets",
+    "enemies",
+    "scene_items",    # len(scene.items()), sampled a few times per second
+    "quality",
+    "input_latency_ms",  # key event -> first paint showing it, only on frames where one landed
+]
+
+class GameMetrics:
+    """Rolling window of per-frame counters, optionally appended to a CSV or JSON-lines file.
+
+    Rows are buffered and written every flush_every frames. Once the file grows past
+    max_bytes it is rotated to <path>.1, so a long session keeps at most two files.
+    """
+
+    def __init__(self, window=120, path=None, flush_every=60, max_bytes=5 * 1024 * 1024):
+        self.rows = collections.deque(maxlen=window)
+        self.pending = []
+        self.flush_every = flush_every
+        self.max_bytes = max_bytes
+        self.frames = 0
+        self.path = None
+        self.setExport(path)
+
+    def setExport(self, path):
+        """Starts appending to path (.csv, anything else is JSON lines); None stops."""
+        self.flush()
+        self.path = path
+        self.csv = bool(path) and path.lower().endswith(".csv")
+
+    def record(self, **counters):
+        counters["time"] = round(time.time(), 3)
+        self.rows.append(counters)
+        self.frames += 1
+        if self.path:
+            self.pending.append(counters)
+            if len(self.pending) >= self.flush_every:
+                self.flush()
+
+    def latest(self):
+        return self.rows[-1] if self.rows else {}
+
+    def average(self, field):
+        values = [row[field] for row in self.rows if field in row]
+        return sum(values) / len(values) if values else 0.0
+
+    def percentile(self, field, p):
+        return percentile([row[field] for row in self.rows if field in row], p)
+
+    def summary(self):
+        """Window averages of the timing fields plus the latest counters."""
+        summary = dict(self.latest())
+        for field in ("frame_ms", "tick_ms", "paint_ms", "jitter_ms"):
+            summary[field] = self.average(field)
+        summary["frame_p95_ms"] = self.percentile("frame_ms", 95)
+        # Sparse: only frames that showed an input carry it
+        if any("input_latency_ms" in row for row in self.rows):
+            summary["input_latency_ms"] = self.average("input_latency_ms")
+            summary["input_p95_ms"] = self.percentile("input_latency_ms", 95)
+        return summary
+
+    def flush(self):
+        rows, self.pending = self.pending, []
+        if not rows or not self.path:
+            return
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "a", newline="") as f:
+                if self.csv:
+                    writer = csv.DictWriter(f, METRIC_FIELDS, extrasaction="ignore")
+                    if new_file:
+                        writer.writeheader()
+                    writer.writerows(rows)
+                else:
+                    for row in rows:
+                        f.write(json.dumps(row) + "\n")
+        except OSError:
+            # Export is a diagnostic aid, never a reason to break the game
+            self.path = None
+
+# ----------------------------------------Profiler Capture----------------------------------------
+class ProfilerCapture:
+    """Start/stop cProfile (and optionally tracemalloc) capture windows on a running game.
+
+    Between captures nothing is hooked: callers check `active` and only then wrap the
+    frame in enable()/disable().
+    """
+
+    def __init__(self, directory, focus=("updateGame", "moveRocket", "enemyShoot")):
+        self.directory = directory
+        self.focus = focus
+        self.profiler = None
+        self.snapshot = None
+        self.owns_tracemalloc = False
+        self.started = 0.0
+
+    @property
+    def active(self):
+        return self.profiler is not None
+
+    def start(self, memory=False):
+        # Imported here: only a capture needs them and they slow down the game's startup
+        import cProfile
+        self.profiler = cProfile.Profile()
+        self.started = time.perf_counter()
+        if memory:
+            self.owns_tracemalloc = not tracemalloc.is_tracing()
+            if self.owns_tracemalloc:
+                tracemalloc.start()
+            self.snapshot = tracemalloc.take_snapshot()
+
+    def enable(self):
+        self.profiler.enable()
+
+    def disable(self):
+        self.profiler.disable()
+
+    def stop(self):
+        """Ends the capture and writes the reports. Returns the paths written."""
+        profiler, self.profiler = self.profiler, None
+        before, self.snapshot = self.snapshot, None
+        after = tracemalloc.take_snapshot() if before is not None else None
+        if self.owns_tracemalloc:
+            tracemalloc.stop()
+            self.owns_tracemalloc = False
+        seconds = time.perf_counter() - self.started
+
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, time.strftime("profile_%Y%m%d_%H%M%S"))
+        prof_path = base + ".prof"
+        text_path = base + ".txt"
+        profiler.dump_stats(prof_path)
+
+        import pstats
+
+        with open(text_path, "w") as f:
+            f.write(f"Capture of {seconds:.2f} s, load {prof_path} with pstats or snakeviz\n\n")
+            stats = pstats.Stats(profiler, stream=f)
+            stats.sort_stats("cumulative")
+            stats.print_stats(40)
+            stats.print_callees("|".join(self.focus))
+            if after is not None:
+                f.write("Allocations since capture start (top 25 lines)\n\n")
+                for stat in after.compare_to(before, "lineno")[:25]:
+                    f.write(f"{stat}\n")
+        return prof_path, text_path
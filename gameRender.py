@@ -0,0 +1,329 @@
+from spaceGame.gameAssets import SPRITES
+from spaceGame.gameUtil import loadNumpy
+from spaceGame.gameSim import SCENE_HEIGHT
+try:
+    from PySide6 import QtCore, QtGui, QtWidgets
+except ImportError:
+    from PySide2 import QtCore, QtGui, QtWidgets
+
+BULLET_COLORS = {
+    "green": QtCore.Qt.green,
+    "red": QtCore.Qt.red,
+    "magenta": QtCore.Qt.magenta,
+}
+
+# Painting area of the batch layers; a bit larger than the 400x550 scene for bullets leaving it
+BATCH_BOUNDS = QtCore.QRectF(-50, -50, 500, 650)
+# From this many enemy bullets on (numpy fields only) they are stamped into one image instead of
+# drawn as one QRectF each; below it the image's fixed cost is higher than the rects'
+RASTER_BULLETS = 1500
+
+# ----------------------------------------Sprite Atlas----------------------------------------
+class SpriteAtlas:
+    """All enemy sprites packed side by side in one pixmap, so a layer draws from a single source."""
+
+    def __init__(self):
+        self.pixmap = QtGui.QPixmap()
+        self.rects = {}
+
+    def rect(self, icon_filename, size):
+        rect = self.rects.get((icon_filename, size))
+        if rect is None:
+            self.rects[(icon_filename, size)] = None
+            self.rebuild()
+            rect = self.rects[(icon_filename, size)]
+        return rect
+
+    def rebuild(self):
+        sprites = [(key, SPRITES.get(*key)) for key in self.rects]
+        width = sum(pixmap.width() for _, pixmap in sprites)
+        height = max(pixmap.height() for _, pixmap in sprites)
+        atlas = QtGui.QPixmap(width, height)
+        atlas.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(atlas)
+        x = 0
+        for key, pixmap in sprites:
+            painter.drawPixmap(x, 0, pixmap)
+            self.rects[key] = QtCore.QRectF(x, 0, pixmap.width(), pixmap.height())
+            x += pixmap.width()
+        painter.end()
+        self.pixmap = atlas
+
+class GlyphStrip:
+    """Digits 0-9 rendered once into a strip; HP numbers are drawn as fragments of it."""
+
+    def __init__(self, color=QtCore.Qt.yellow):
+        font = QtWidgets.QApplication.font()
+        metrics = QtGui.QFontMetrics(font)
+        self.cell = max(metrics.horizontalAdvance(str(d)) for d in range(10))
+        self.height = metrics.height()
+        self.pixmap = QtGui.QPixmap(self.cell * 10, self.height)
+        self.pixmap.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(self.pixmap)
+        painter.setFont(font)
+        painter.setPen(QtGui.QColor(color))
+        for d in range(10):
+            painter.drawText(QtCore.QRectF(d * self.cell, 0, self.cell, self.height), QtCore.Qt.AlignCenter, str(d))
+        painter.end()
+        self.rects = [QtCore.QRectF(d * self.cell, 0, self.cell, self.height) for d in range(10)]
+
+# ----------------------------------------Fragment Drawing----------------------------------------
+def drawFragments(painter, fragments, pixmap):
+    """One drawPixmapFragments call where the binding accepts a list, one call per fragment otherwise."""
+    if not fragments:
+        return
+    if drawFragments.batched:
+        try:
+            painter.drawPixmapFragments(fragments, len(fragments), pixmap)
+            return
+        except TypeError:
+            # PySide6 only exposes the single-fragment overload
+            drawFragments.batched = False
+    for fragment in fragments:
+        painter.drawPixmapFragments(fragment, 1, pixmap)
+
+drawFragments.batched = True
+
+# ----------------------------------------Bullet Raster----------------------------------------
+class BulletRaster:
+    """Stamps same-sized bullets into an ARGB image over BATCH_BOUNDS with numpy, no Python
+    object per bullet. Each bullet looks like a drawRects rect: 1 px black outline, colour fill
+    (overlapping bullets merge into one outlined shape instead of stacking).
+
+    Bullet top-left corners are set in a padded impulse mask, which is then widened by OR-ing
+    shifted slices, once for the outline box and once for the fill.
+    """
+
+    def __init__(self, bullet_width, bullet_height):
+        self.np = numpy = loadNumpy()
+        self.left = int(BATCH_BOUNDS.left())
+        self.top = int(BATCH_BOUNDS.top())
+        self.width = int(BATCH_BOUNDS.width())
+        self.height = int(BATCH_BOUNDS.height())
+        # The outline is one px wider and taller than the rect, as drawn with a 1 px pen
+        self.box = (bullet_width + 1, bullet_height + 1)
+        bw, bh = self.box
+        self.impulses = numpy.zeros((self.height + bh - 1, self.width + bw - 1), bool)
+        self.rows = numpy.zeros((self.height + bh - 1, self.width), bool)
+        self.outline = numpy.zeros((self.height, self.width), bool)
+        self.fill = numpy.zeros((self.height, self.width), bool)
+        self.pixels = numpy.zeros((self.height, self.width), numpy.uint32)
+        self.image = QtGui.QImage(self.pixels.data, self.width, self.height, self.width * 4,
+                                  QtGui.QImage.Format_ARGB32_Premultiplied)
+        self.origin = QtCore.QPointF(self.left, self.top)
+
+    def widen(self, out, width, height, offset=0):
+        """out[r, c] = any impulse within `height` rows above / `width` columns left of (r, c) - offset."""
+        np = self.np
+        bw, bh = self.box
+        rows = self.rows
+        x0 = bw - width - offset
+        rows[:] = self.impulses[:, x0:x0 + self.width]
+        for j in range(1, width):
+            np.logical_or(rows, self.impulses[:, x0 + j:x0 + j + self.width], out=rows)
+        y0 = bh - height - offset
+        out[:] = rows[y0:y0 + self.height]
+        for i in range(1, height):
+            np.logical_or(out, rows[y0 + i:y0 + i + self.height], out=out)
+
+    def render(self, xs, ys, color):
+        """Draws the bullets at (xs, ys) (numpy arrays, scene coordinates) in `color`; returns the image."""
+        np = self.np
+        bw, bh = self.box
+        cx = np.rint(xs).astype(np.intp) - self.left
+        cy = np.rint(ys).astype(np.intp) - self.top
+        keep = (cx > -bw) & (cx < self.width) & (cy > -bh) & (cy < self.height)
+        self.impulses[:] = False
+        self.impulses[cy[keep] + bh - 1, cx[keep] + bw - 1] = True
+        self.widen(self.outline, bw, bh)
+        self.widen(self.fill, bw - 2, bh - 2, offset=1)
+        argb = QtGui.QColor(BULLET_COLORS.get(color, QtCore.Qt.green)).rgba()
+        black = QtGui.QColor(QtCore.Qt.black).rgba()
+        np.multiply(self.outline, black, out=self.pixels, casting="unsafe")
+        self.pixels[self.fill] = argb
+        return self.image
+
+# ----------------------------------------Batch Layers----------------------------------------
+class BulletBatchItem(QtWidgets.QGraphicsItem):
+    """Every bullet in one item: one drawRects call per bullet colour, plus an optional
+    BulletRaster image for big enemy fields."""
+
+    def __init__(self):
+        super().__init__()
+        self.rects = {}
+        self.raster = None
+        self.raster_origin = None
+        self.pen = QtGui.QPen()
+        self.brushes = {}
+        self.setZValue(2)
+
+    def boundingRect(self):
+        return BATCH_BOUNDS
+
+    def setBullets(self, rects, raster=None, raster_origin=None):
+        self.rects = rects
+        self.raster = raster
+        self.raster_origin = raster_origin
+        self.update()
+
+    def paint(self, painter, option, widget=None):
+        if self.raster is not None:
+            painter.drawImage(self.raster_origin, self.raster)
+        painter.setPen(self.pen)
+        for color, rects in self.rects.items():
+            brush = self.brushes.get(color)
+            if brush is None:
+                brush = self.brushes[color] = QtGui.QBrush(BULLET_COLORS.get(color, QtCore.Qt.green))
+            painter.setBrush(brush)
+            painter.drawRects(rects)
+
+class EnemyBatchItem(QtWidgets.QGraphicsItem):
+    """Every enemy in one item, drawn as fragments of the sprite atlas, HP from the glyph strip."""
+
+    def __init__(self):
+        super().__init__()
+        self.atlas = SpriteAtlas()
+        self.glyphs = GlyphStrip()
+        self.sprites = []
+        self.digits = []
+        self.smooth = True
+        self.setZValue(5)
+
+    def boundingRect(self):
+        return BATCH_BOUNDS
+
+    def setFragments(self, sprites, digits):
+        self.sprites = sprites
+        self.digits = digits
+        self.update()
+
+    def paint(self, painter, option, widget=None):
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, self.smooth)
+        drawFragments(painter, self.sprites, self.atlas.pixmap)
+        drawFragments(painter, self.digits, self.glyphs.pixmap)
+
+# ----------------------------------------Batch Renderer----------------------------------------
+class BatchRenderer:
+    """Renders the world's bullets and enemies through two layer items, however many there are."""
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.bullet_layer = BulletBatchItem()
+        self.enemy_layer = EnemyBatchItem()
+        scene.addItem(self.bullet_layer)
+        scene.addItem(self.enemy_layer)
+        self.show_hp = True
+        self.raster = None
+
+    def setQuality(self, smooth, show_hp):
+        self.enemy_layer.smooth = smooth
+        self.show_hp = show_hp
+
+    def sync(self, world, alpha=1.0):
+        # The layers redraw from live state, so spawn/remove events are only drained
+        world.drainRemoved()
+        world.drainSpawned()
+
+        rects = {}
+        for b in world.bullets.active:
+            x = b.prev_x + (b.x - b.prev_x) * alpha
+            y = b.prev_y + (b.y - b.prev_y) * alpha
+            bucket = rects.get(b.color)
+            if bucket is None:
+                bucket = rects[b.color] = []
+            bucket.append(QtCore.QRectF(x, y, b.width, b.height))
+        field = world.enemy_bullets
+        raster = None
+        if len(field) >= RASTER_BULLETS and hasattr(field, "arrays"):
+            if self.raster is None:
+                self.raster = BulletRaster(field.width, field.height)
+            raster = self.raster.render(*field.arrays(alpha), field.color)
+        else:
+            xs, ys = field.positions(alpha)
+            bucket = rects.setdefault(field.color, [])
+            bucket.extend(QtCore.QRectF(x, y, field.width, field.height) for x, y in zip(xs, ys))
+        self.bullet_layer.setBullets(rects, raster, self.raster.origin if raster is not None else None)
+
+        if world.swarm is not None:
+            enemies = self.swarmEnemies(world.swarm, alpha)
+        else:
+            enemies = [(e.prev_x + (e.x - e.prev_x) * alpha, e.prev_y + (e.y - e.prev_y) * alpha, e.icon, e.width, e.hp)
+                       for e in world.enemies]
+
+        create = QtGui.QPainter.PixmapFragment.create
+        atlas = self.enemy_layer.atlas
+        glyphs = self.enemy_layer.glyphs
+        sprites = []
+        digits = []
+        for x, y, icon, size, hp in enemies:
+            source = atlas.rect(icon, size)
+            sprites.append(create(QtCore.QPointF(x + source.width() / 2, y + source.height() / 2), source))
+            if self.show_hp:
+                # Same anchor as Enemy.hpLabel: (10, -15) from the sprite's top-left
+                gx = x + 10 + glyphs.cell / 2
+                gy = y - 15 + glyphs.height / 2
+                for ch in str(hp):
+                    digits.append(create(QtCore.QPointF(gx, gy), glyphs.rects[ord(ch) - 48]))
+                    gx += glyphs.cell
+        self.enemy_layer.setFragments(sprites, digits)
+
+    def swarmEnemies(self, swarm, alpha):
+        # Only the on-screen part of the formation is turned into fragments
+        visible = swarm.visible(SCENE_HEIGHT)
+        xs = swarm.prev_x[visible] + (swarm.x[visible] - swarm.prev_x[visible]) * alpha
+        ys = swarm.prev_y[visible] + (swarm.y[visible] - swarm.prev_y[visible]) * alpha
+        # Single-hit swarms skip the HP digits, they would only ever read "1"
+        hps = swarm.hp[visible].tolist() if swarm.hp.max(initial=0) > 1 else [""] * len(visible)
+        return [(x, y, swarm.icon, swarm.size, hp) for x, y, hp in zip(xs.tolist(), ys.tolist(), hps)]
+
+    def remove(self):
+        self.scene.removeItem(self.bullet_layer)
+        self.scene.removeItem(self.enemy_layer)
+
+# ----------------------------------------Render Profiles----------------------------------------
+# How the view and scene are set up, independent of the render mode (see gameBench --profile
+# for frame times per profile on a given machine).
+#   index:      scene item index, "bsp" (Qt's default) or "none"
+#   update:     viewport update mode
+#   background: "item" is a pixmap item in the scene; "view" is pre-blended and drawn by
+#               GameView.drawBackground from the view's background cache
+#   flags:      QGraphicsView optimization flags to switch on, all others are off
+RENDER_PROFILES = {
+    "default": {"index": "bsp", "update": "minimal", "background": "item", "flags": ()},
+    # Nearly every item moves each tick, so maintaining the BSP tree costs more than it saves
+    "fast": {"index": "none", "update": "full", "background": "view",
+             "flags": ("DontSavePainterState", "DontAdjustForAntialiasing")},
+    # Like fast, but repaints only the rect bounding all changes, for big windows with a quiet wave
+    "bounded": {"index": "none", "update": "bounding", "background": "view",
+                "flags": ("DontSavePainterState", "DontAdjustForAntialiasing")},
+}
+
+VIEWPORT_UPDATES = {
+    "minimal": QtWidgets.QGraphicsView.MinimalViewportUpdate,
+    "smart": QtWidgets.QGraphicsView.SmartViewportUpdate,
+    "bounding": QtWidgets.QGraphicsView.BoundingRectViewportUpdate,
+    "full": QtWidgets.QGraphicsView.FullViewportUpdate,
+}
+
+OPTIMIZATION_FLAGS = ("DontSavePainterState", "DontAdjustForAntialiasing")
+
+def applyProfile(view, scene, name):
+    """Sets up view and scene for the named profile and returns the profile."""
+    profile = RENDER_PROFILES[name]
+    scene.setItemIndexMethod(QtWidgets.QGraphicsScene.BspTreeIndex if profile["index"] == "bsp"
+                             else QtWidgets.QGraphicsScene.NoIndex)
+    view.setViewportUpdateMode(VIEWPORT_UPDATES[profile["update"]])
+    for flag in OPTIMIZATION_FLAGS:
+        view.setOptimizationFlag(getattr(QtWidgets.QGraphicsView, flag), flag in profile["flags"])
+    view.setCacheMode(QtWidgets.QGraphicsView.CacheBackground if profile["background"] == "view"
+                      else QtWidgets.QGraphicsView.CacheNone)
+    return profile
+
+def preblend(pixmap, color):
+    """An opaque copy of pixmap over a solid colour, so drawing it needs no alpha blending."""
+    blended = QtGui.QPixmap(pixmap.size())
+    blended.fill(color)
+    painter = QtGui.QPainter(blended)
+    painter.drawPixmap(0, 0, pixmap)
+    painter.end()
+    return blended
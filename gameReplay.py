@@ -0,0 +1,104 @@
+"""Headless replay of recorded games, as fast as the CPU allows.
+
+    python -m spaceGame.gameReplay replays/replay_*.json
+    python -m spaceGame.gameReplay --repeat 5 --out replay_bench.json replays/replay_*.json
+
+Replays only need the pure-Python simulation, no Qt or Maya. Every checkpoint and the
+final outcome are compared with the recording; the exit code is 1 on any mismatch.
+"""
+import os, sys, json, time, argparse
+
+from spaceGame.gameSim import GameWorld
+from spaceGame.gameCollision import Hitbox
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def save(recording, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        # Compact on purpose: the input log and the hitbox masks are long lists of ints
+        json.dump(recording, f, separators=(",", ":"))
+
+def hitboxesFrom(recording):
+    """The (icon, size) -> Hitbox masks stored with a recording."""
+    return {(icon, size): Hitbox(left, top, right, bottom, rows)
+            for icon, size, left, top, right, bottom, rows in recording["hitboxes"]}
+
+def buildWorld(recording):
+    overrides = dict(recording["overrides"])
+    if recording.get("version", 1) < 2:
+        # Recorded before the fire cooldown existed
+        overrides.setdefault("fire_cooldown_ms", 0)
+    return GameWorld(recording["difficulty"], recording["player_name"], hitboxes=hitboxesFrom(recording),
+                     seed=recording["seed"], **overrides)
+
+def replay(recording):
+    """Re-runs a recording. Returns (world, mismatches) where mismatches lists every divergence."""
+    world = buildWorld(recording)
+    outcome = recording["outcome"]
+    inputs = recording["inputs"]
+    expected = {checkpoint[0]: checkpoint for checkpoint in recording["checkpoints"]}
+    mismatches = []
+
+    cursor = 0
+    while world.ticks < outcome["ticks"] and world.state == "playing":
+        while cursor < len(inputs) and inputs[cursor][0] <= world.ticks:
+            world.applyInput(inputs[cursor][1])
+            cursor += 1
+        world.step()
+        checkpoint = expected.get(world.ticks)
+        if checkpoint is not None and world.checkpoint() != checkpoint:
+            mismatches.append({"tick": world.ticks, "expected": checkpoint, "got": world.checkpoint()})
+    # Inputs after the last step (e.g. fire on the game-over screen) don't change the outcome
+    got = {"state": world.state, "ticks": world.ticks, "score": world.score, "player_hp": world.player_hp}
+    if got != outcome:
+        mismatches.append({"tick": world.ticks, "expected": outcome, "got": got})
+    return world, mismatches
+
+def bench(recording, repeat=1):
+    """Replays `repeat` times; returns timing of the fastest run plus the mismatches of the first."""
+    times = []
+    mismatches = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        world, result = replay(recording)
+        times.append(time.perf_counter() - start)
+        if mismatches is None:
+            mismatches = result
+    best = min(times)
+    return {
+        "difficulty": recording["difficulty"],
+        "ticks": world.ticks,
+        "best_s": round(best, 4),
+        "mean_s": round(sum(times) / len(times), 4),
+        "ticks_per_s": round(world.ticks / best) if best else 0,
+        "ok": not mismatches,
+        "mismatches": mismatches,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded Space Invader games headlessly")
+    parser.add_argument("paths", nargs="+", help="replay JSON files")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per replay, the fastest is reported")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for path in args.paths:
+        result = bench(load(path), args.repeat)
+        results[os.path.basename(path)] = result
+        status = "ok" if result["ok"] else f"MISMATCH at tick {result['mismatches'][0]['tick']}"
+        print(f"{os.path.basename(path)}: {result['difficulty']} {result['ticks']} ticks "
+              f"in {result['best_s'] * 1000:.1f} ms ({result['ticks_per_s']} ticks/s) {status}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(result["ok"] for result in results.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
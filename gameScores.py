@@ -0,0 +1,165 @@
+from spaceGame.gameUtil import RESOURCES_PATH
+try:
+    from PySide6 import QtCore
+except ImportError:
+    from PySide2 import QtCore
+
+import os, json, time, bisect, itertools
+
+SCORES_PATH = os.path.join(os.path.dirname(RESOURCES_PATH), "scores", "scores.jsonl").replace("\\", "/")
+
+# ----------------------------------------Index----------------------------------------
+class ScoreIndex:
+    """Best `keep` scores per difficulty, each list kept sorted (highest first, oldest first on ties)."""
+
+    def __init__(self, keep=100):
+        self.keep = keep
+        self.boards = {}
+        self.order = itertools.count()
+
+    def add(self, entry):
+        """Returns the 1-based rank of the entry, or None when it didn't make the index."""
+        board = self.boards.setdefault(entry["difficulty"], [])
+        row = (-entry["score"], entry["time"], next(self.order), entry)
+        position = bisect.bisect(board, row)
+        if position >= self.keep:
+            return None
+        board.insert(position, row)
+        del board[self.keep:]
+        return position + 1
+
+    def top(self, difficulty, n=10):
+        return [row[3] for row in self.boards.get(difficulty, [])[:n]]
+
+    def entries(self):
+        return [row[3] for board in self.boards.values() for row in board]
+
+# ----------------------------------------Worker Tasks----------------------------------------
+class _LoadTask(QtCore.QRunnable):
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def run(self):
+        entries = []
+        lines = 0
+        try:
+            with open(self.store.path) as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # A torn last line from a crash; compaction drops it
+                        pass
+        except OSError:
+            pass
+        self.store.loaded.emit(entries, lines)
+
+class _AppendTask(QtCore.QRunnable):
+    def __init__(self, path, entry):
+        super().__init__()
+        self.path = path
+        self.entry = entry
+
+    def run(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(self.entry) + "\n")
+        except OSError:
+            pass
+
+class _CompactTask(QtCore.QRunnable):
+    def __init__(self, path, entries):
+        super().__init__()
+        self.path = path
+        self.entries = entries
+
+    def run(self):
+        temp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp, "w") as f:
+                for entry in self.entries:
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(temp, self.path)
+        except OSError:
+            pass
+
+# ----------------------------------------Score Store----------------------------------------
+class ScoreStore(QtCore.QObject):
+    """Leaderboard on an append-only JSON-lines log.
+
+    All file I/O runs in order on one worker thread. The in-memory index is only touched on
+    the GUI thread, so record() and top() never wait on the disk. load() is lazy and async;
+    changed fires once the board is readable and after every record(). The log is rewritten
+    with just the indexed entries every compact_every records.
+    """
+
+    loaded = QtCore.Signal(object, int)
+    changed = QtCore.Signal()
+
+    def __init__(self, path=SCORES_PATH, keep=100, compact_every=200):
+        super().__init__()
+        self.path = path
+        self.index = ScoreIndex(keep)
+        self.compact_every = compact_every
+        self.appended = 0
+        self.state = "unloaded"
+        # Records made before the log finished loading, merged in once it has
+        self.early = []
+        self.pool = QtCore.QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.loaded.connect(self._onLoaded)
+
+    def load(self):
+        """Starts reading the log in the background, once."""
+        if self.state == "unloaded":
+            self.state = "loading"
+            self.pool.start(_LoadTask(self))
+
+    def isLoaded(self):
+        return self.state == "loaded"
+
+    def record(self, player_name, difficulty, score, won, ticks=0):
+        """Adds a finished game. Returns its rank on the board, None if it isn't on it (or not loaded yet)."""
+        entry = {"player": player_name, "difficulty": difficulty, "score": score, "won": bool(won),
+                 "ticks": ticks, "time": round(time.time(), 3)}
+        if self.state != "loaded":
+            # Queued ahead of the append, so the log it reads never contains this entry
+            self.load()
+            self.early.append(entry)
+            self.pool.start(_AppendTask(self.path, entry))
+            return None
+        self.pool.start(_AppendTask(self.path, entry))
+        self.appended += 1
+        rank = self.index.add(entry)
+        if self.appended >= self.compact_every:
+            self.compact()
+        self.changed.emit()
+        return rank
+
+    def top(self, difficulty, n=10):
+        return self.index.top(difficulty, n)
+
+    def compact(self):
+        self.appended = 0
+        self.pool.start(_CompactTask(self.path, sorted(self.index.entries(), key=lambda e: e["time"])))
+
+    def wait(self, msecs=2000):
+        """Blocks until queued writes are on disk, e.g. before a standalone app exits."""
+        return self.pool.waitForDone(msecs)
+
+    def _onLoaded(self, entries, lines):
+        for entry in entries:
+            self.index.add(entry)
+        for entry in self.early:
+            self.index.add(entry)
+        self.early = []
+        self.state = "loaded"
+        if lines > 2 * len(self.index.entries()):
+            self.compact()
+        self.changed.emit()
+
+SCORES = ScoreStore()
@@ -0,0 +1,633 @@
+import random, collections
+
+from spaceGame.gameCollision import Hitbox, SpatialHash, hits
+from spaceGame.gameSwarm import SwarmFormation
+from spaceGame.gameBullets import PATTERNS, BulletField, EmitterSchedule, patternVelocities
+
+# ----------------------------------------Scene Constants----------------------------------------
+SCENE_WIDTH = 400
+SCENE_HEIGHT = 550
+
+ROCKET_SIZE = 40
+ENEMY_SIZE = 35
+BOSS_SIZE = 100
+BULLET_WIDTH = 5
+BULLET_HEIGHT = 15
+
+ROCKET_ICON = "mc.png"
+ROCKET_START = (180, 500)
+ROCKET_STEP = 5           # px per ROCKET_STEP_MS of held input
+ROCKET_STEP_MS = 16
+BOSS_SPEED = 3
+
+MAX_CATCHUP_STEPS = 5
+# A (tick, score, player_hp, enemies, enemy bullets) checkpoint is logged every N steps
+CHECKPOINT_TICKS = 60
+
+# ----------------------------------------Difficulty Table----------------------------------------
+BASE_SETTINGS = {
+    "enemy_icon": "zombie.png",
+    "enemies_per_wave": 6,
+    "player_bullet_color": "green",
+    "enemy_bullet_color": "red",
+    "enemy_bullet_speed": 6,
+    "player_hp": 3,
+    "speed_enemy": 1,
+    "timer_interval": 30,
+    # Shortest gap between two player shots; holding fire shoots at this rate
+    "fire_cooldown_ms": 150,
+    # Enemy fire, see gameBullets.EmitterSchedule / PATTERNS
+    "bullet_phases": [{"hp_below": 1.0, "sequence": [(1000, "single")]}],
+    "enemy_hp": 1,
+    "is_boss": False,
+    "bg_filename": "easy_bg.jpg",
+    "opacity_level": 0.5,
+    "pixel_perfect": True,
+    "bullet_pool_size": 64,
+    "enemy_size": ENEMY_SIZE,
+    "swarm": False,
+    "render_mode": None,
+}
+
+DIFFICULTY_SETTINGS = {
+    "Easy": {},
+    "Normal": {
+        "bg_filename": "normal_bg.jpg",
+        "speed_enemy": 2,
+        "enemy_hp": 2,
+        "enemy_icon": "mummy.png",
+        "enemies_per_wave": 8,
+        "enemy_bullet_speed": 7,
+    },
+    "Hard": {
+        "bg_filename": "hard_bg.jpg",
+        "speed_enemy": 3,
+        "enemy_hp": 2,
+        "enemy_icon": "vampire.png",
+        "enemies_per_wave": 10,
+        "enemy_bullet_speed": 8,
+    },
+    "Goddamn": {
+        "bg_filename": "goddamn_bg.jpg",
+        "speed_enemy": 3,
+        "enemy_hp": 100,
+        "is_boss": True,
+        "enemy_icon": "the witch.png",
+        "enemies_per_wave": 1,
+        "opacity_level": 0.3,
+        "player_hp": 2,
+        "enemy_bullet_speed": 8,
+        "enemy_bullet_color": "magenta",
+        "bullet_pool_size": 128,
+        "render_mode": "batch",
+        # The witch gets nastier as her HP drops
+        "bullet_phases": [
+            {"hp_below": 1.0, "sequence": [(250, "fan5")]},
+            {"hp_below": 0.6, "sequence": [(250, "fan5"), (250, "fan5"), (250, "ring24")]},
+            {"hp_below": 0.3, "sequence": [(90, "spiral6"), (90, "spiral6"), (90, "spiral6"), (90, "aimed3")]},
+        ],
+    },
+    # Needs numpy: the wave lives in gameSwarm.SwarmFormation arrays
+    "Swarm": {
+        "bg_filename": "hard_bg.jpg",
+        "enemy_icon": "zombie.png",
+        "enemies_per_wave": 960,
+        "enemy_size": 14,
+        "speed_enemy": 2,
+        "swarm": True,
+        "render_mode": "batch",
+        "bullet_phases": [{"hp_below": 1.0, "sequence": [(1000, "swarm_single")]}],
+        "bullet_pool_size": 256,
+        "opacity_level": 0.4,
+    },
+}
+
+def difficultySettings(difficulty="Easy", **overrides):
+    settings = dict(BASE_SETTINGS)
+    settings.update(DIFFICULTY_SETTINGS.get(difficulty, {}))
+    settings.update(overrides)
+    return settings
+
+# ----------------------------------------Entities----------------------------------------
+class SimRocket:
+    __slots__ = ("x", "y", "prev_x", "prev_y", "width", "height", "hitbox")
+
+    def __init__(self, x, y, width=ROCKET_SIZE, height=ROCKET_SIZE, hitbox=None):
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+        self.width = width
+        self.height = height
+        self.hitbox = hitbox or Hitbox.box(width, height)
+
+class SimEnemy:
+    __slots__ = ("x", "y", "prev_x", "prev_y", "width", "height", "hp", "icon", "alive", "hitbox")
+
+    def __init__(self, x, y, hp=1, icon="zombie.png", size=ENEMY_SIZE, hitbox=None):
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+        self.width = size
+        self.height = size
+        self.hp = hp
+        self.icon = icon
+        self.alive = True
+        self.hitbox = hitbox or Hitbox.box(size, size)
+
+    def hit(self):
+        self.hp -= 1
+        return self.hp <= 0
+
+class SimBoss(SimEnemy):
+    __slots__ = ("direction_x",)
+
+    def __init__(self, x, y, hp=100, icon="the witch.png", size=BOSS_SIZE, hitbox=None):
+        super().__init__(x, y, hp, icon, size, hitbox)
+        self.direction_x = 1
+
+class SimBullet:
+    __slots__ = ("x", "y", "prev_x", "prev_y", "dx", "dy", "speed", "color", "alive", "index")
+
+    width = BULLET_WIDTH
+    height = BULLET_HEIGHT
+
+    def __init__(self, x, y, dx=0.0, dy=-1.0, speed=10, color="green"):
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+        self.dx = dx
+        self.dy = dy
+        self.speed = speed
+        self.color = color
+        self.alive = True
+        # Slot in the owning BulletPool's active list, -1 while free
+        self.index = -1
+
+# ----------------------------------------Bullet Pool----------------------------------------
+class BulletPool:
+    """Preallocated, growable SimBullet storage with swap-remove so release is O(1)."""
+
+    def __init__(self, capacity=64):
+        self.active = []
+        self.free = []
+        self.capacity = 0
+        self.high_water = 0
+        self.grow(capacity)
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def grow(self, count):
+        self.free.extend(SimBullet(0, 0) for i in range(count))
+        self.capacity += count
+
+    def acquire(self, x, y, dx, dy, speed, color):
+        if not self.free:
+            self.grow(self.capacity or 16)
+        bullet = self.free.pop()
+        bullet.x = bullet.prev_x = x
+        bullet.y = bullet.prev_y = y
+        bullet.dx = dx
+        bullet.dy = dy
+        bullet.speed = speed
+        bullet.color = color
+        bullet.alive = True
+        bullet.index = len(self.active)
+        self.active.append(bullet)
+        if len(self.active) > self.high_water:
+            self.high_water = len(self.active)
+        return bullet
+
+    def remove(self, bullet):
+        active = self.active
+        last = active.pop()
+        if last is not bullet:
+            active[bullet.index] = last
+            last.index = bullet.index
+        bullet.index = -1
+        self.free.append(bullet)
+
+    def clear(self):
+        for bullet in self.active:
+            bullet.alive = False
+            bullet.index = -1
+        self.free.extend(self.active)
+        self.active = []
+
+    def stats(self):
+        return {"capacity": self.capacity, "active": len(self.active), "high_water": self.high_water}
+
+# ----------------------------------------World----------------------------------------
+class GameWorld:
+    """Pure-Python game state. GameWindow only renders from it.
+
+    hitboxes maps (icon, size) to a Hitbox; sprites without one collide as full boxes.
+    All randomness comes from self.rng, seeded with `seed` (a fresh one when None), so
+    the seed plus the input log from recording() reproduces a game exactly.
+    """
+
+    def __init__(self, difficulty="Easy", player_name="Player", hitboxes=None, seed=None, **overrides):
+        self.difficulty = difficulty
+        self.player_name = player_name
+        self.overrides = overrides
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.settings = difficultySettings(difficulty, **overrides)
+        self.hitboxes = hitboxes or {}
+        self.pixel_perfect = self.settings["pixel_perfect"]
+
+        self.enemy_icon = self.settings["enemy_icon"]
+        self.enemies_per_wave = self.settings["enemies_per_wave"]
+        self.enemy_bullet_speed = self.settings["enemy_bullet_speed"]
+        self.player_hp = self.settings["player_hp"]
+        self.speed_enemy = self.settings["speed_enemy"]
+        self.enemy_hp = self.settings["enemy_hp"]
+        self.is_boss = self.settings["is_boss"]
+        self.enemy_size = self.settings["enemy_size"]
+        self.step_ms = self.settings["timer_interval"]
+        self.fire_cooldown_ms = self.settings["fire_cooldown_ms"]
+
+        self.rocket = SimRocket(*ROCKET_START, hitbox=self.hitboxes.get((ROCKET_ICON, ROCKET_SIZE)))
+        pool_size = self.settings["bullet_pool_size"]
+        self.bullets = BulletPool(pool_size)
+        self.enemy_bullets = BulletField(pool_size, BULLET_WIDTH, BULLET_HEIGHT, self.settings["enemy_bullet_color"])
+        self.emitters = EmitterSchedule(self.settings["bullet_phases"])
+        self.enemies = []
+        self.swarm = None
+        self.enemy_grid = SpatialHash()
+        self.score = 0
+        self.key_left = self.key_right = self.fire_held = False
+        # Latched by every fire press until it shoots, so a tap released within one step still fires
+        self.fire_pressed = False
+        self.next_fire_ms = 0
+        self.state = "playing"
+        self.ticks = 0
+
+        # Entities added/removed since the renderer last drained them
+        self.spawned = []
+        self.removed = []
+
+        # UI input waiting for the next step: (event, stamp), stamps are handed back through
+        # drainAppliedInputs() once the step that applied them has run
+        self.input_queue = collections.deque()
+        self.applied_inputs = []
+
+        # Replay log: [tick, event] with "L"/"l", "R"/"r", "S"/"s" for left/right/fire down/up and
+        # "F" for a single shot, where tick is the number of steps completed when the input arrived
+        self.inputs = []
+        self.checkpoints = []
+        self.logged_keys = (False, False, False)
+
+        self.createEnemies()
+
+    def createEnemies(self):
+        self.enemies = []
+        self.enemy_grid.clear()
+        self.enemy_direction = 1
+        self.enemy_step_down = 10
+
+        if self.is_boss:
+            hitbox = self.hitboxes.get((self.enemy_icon, BOSS_SIZE))
+            self.spawn(self.enemies, SimBoss(150, 50, self.enemy_hp, icon=self.enemy_icon, hitbox=hitbox), self.enemy_grid)
+        elif self.settings["swarm"]:
+            size = self.enemy_size
+            hitbox = self.hitboxes.get((self.enemy_icon, size)) or Hitbox.box(size, size)
+            self.swarm = SwarmFormation(self.enemies_per_wave, self.enemy_hp, self.enemy_icon, size, hitbox,
+                                        seed=self.rng.getrandbits(32), scene_width=SCENE_WIDTH)
+        else:
+            size = self.enemy_size
+            hitbox = self.hitboxes.get((self.enemy_icon, size))
+            for i in range(self.enemies_per_wave):
+                x = self.rng.randint(0, 365)
+                y = self.rng.randint(0, 200)
+                self.spawn(self.enemies, SimEnemy(x, y, self.enemy_hp, icon=self.enemy_icon, size=size, hitbox=hitbox), self.enemy_grid)
+
+    def spawn(self, bucket, entity, grid=None):
+        bucket.append(entity)
+        if grid is not None:
+            grid.insert(entity)
+        self.spawned.append(entity)
+        return entity
+
+    def despawn(self, bucket, entity, grid=None):
+        entity.alive = False
+        bucket.remove(entity)
+        if grid is not None:
+            grid.remove(entity)
+        self.removed.append(entity)
+
+    def shoot(self, pool, x, y, dx, dy, speed, color, grid=None):
+        bullet = pool.acquire(x, y, dx, dy, speed, color)
+        if grid is not None:
+            grid.insert(bullet)
+        self.spawned.append(bullet)
+        return bullet
+
+    def poolStats(self):
+        return {"player": self.bullets.stats(), "enemy": self.enemy_bullets.stats()}
+
+    def drainSpawned(self):
+        spawned, self.spawned = self.spawned, []
+        return spawned
+
+    def drainRemoved(self):
+        removed, self.removed = self.removed, []
+        return removed
+
+    # ----------------------------------------Input----------------------------------------
+    def queueInput(self, event, stamp=None):
+        """Buffers a key event ("L"/"l", "R"/"r", "S"/"s", "F") for the next step. `stamp` is any
+        caller time (e.g. perf_counter at the key event), returned once the event is applied."""
+        self.input_queue.append((event, stamp))
+
+    def consumeInputs(self):
+        queue = self.input_queue
+        while queue:
+            event, stamp = queue.popleft()
+            self.applyInput(event)
+            slot = "LRS".find(event.upper())
+            if slot >= 0:
+                # Logged as applied rather than diffed in logKeys, so a press and release
+                # within one step both reach the replay ("F" logs itself in fire())
+                self.inputs.append([self.ticks, event])
+                logged = list(self.logged_keys)
+                logged[slot] = event.isupper()
+                self.logged_keys = tuple(logged)
+            if stamp is not None:
+                self.applied_inputs.append(stamp)
+
+    def drainAppliedInputs(self):
+        applied, self.applied_inputs = self.applied_inputs, []
+        return applied
+
+    def fire(self):
+        """One shot, unless the fire cooldown hasn't run out. Returns the bullet or None."""
+        if self.ticks * self.step_ms < self.next_fire_ms:
+            return None
+        self.inputs.append([self.ticks, "F"])
+        return self.shootPlayer()
+
+    def shootPlayer(self):
+        self.next_fire_ms = self.ticks * self.step_ms + self.fire_cooldown_ms
+        return self.shoot(self.bullets, self.rocket.x + 17, self.rocket.y - 15, 0.0, -1.0, 10, self.settings["player_bullet_color"])
+
+    def moveRocket(self, elapsed_ms=ROCKET_STEP_MS):
+        rocket = self.rocket
+        rocket.prev_x = rocket.x
+        distance = ROCKET_STEP * elapsed_ms / ROCKET_STEP_MS
+        if self.key_left:
+            rocket.x = max(0, rocket.x - distance)
+        if self.key_right:
+            rocket.x = min(SCENE_WIDTH - rocket.width, rocket.x + distance)
+
+    # ----------------------------------------Tick----------------------------------------
+    def step(self):
+        """One fixed simulation step of step_ms: input, movement/collisions, then scheduled shooting."""
+        if self.state != "playing":
+            return
+        self.consumeInputs()
+        self.logKeys()
+        # Presses and held fire are logged as "S"/"s", so these shots aren't logged again as "F"
+        if (self.fire_pressed or self.fire_held) and self.ticks * self.step_ms >= self.next_fire_ms:
+            self.fire_pressed = False
+            self.shootPlayer()
+        self.ticks += 1
+        self.moveRocket(self.step_ms)
+        self.updateGame()
+        if self.state == "playing":
+            for pattern in self.emitters.advance(self.step_ms, self.hpFraction()):
+                self.enemyShoot(pattern)
+        if self.ticks % CHECKPOINT_TICKS == 0 or self.state != "playing":
+            self.checkpoints.append(self.checkpoint())
+
+    # ----------------------------------------Recording----------------------------------------
+    def logKeys(self):
+        # Keys are plain attributes set by the UI, so changes are picked up once per step
+        keys = (self.key_left, self.key_right, self.fire_held)
+        if keys != self.logged_keys:
+            if self.fire_held and not self.logged_keys[2]:
+                # Same latch applyInput("S") sets when this press is replayed
+                self.fire_pressed = True
+            for held, was, down, up in zip(keys, self.logged_keys, "LRS", "lrs"):
+                if held != was:
+                    self.inputs.append([self.ticks, down if held else up])
+            self.logged_keys = keys
+
+    def applyInput(self, event):
+        """Applies one queued or logged input event."""
+        if event == "F":
+            self.fire()
+        elif event in "Ll":
+            self.key_left = event == "L"
+        elif event in "Rr":
+            self.key_right = event == "R"
+        elif event in "Ss":
+            self.fire_held = event == "S"
+            if self.fire_held:
+                self.fire_pressed = True
+
+    def checkpoint(self):
+        enemies = len(self.swarm) if self.swarm is not None else len(self.enemies)
+        return [self.ticks, self.score, self.player_hp, enemies, len(self.enemy_bullets)]
+
+    def recording(self):
+        """Everything needed to replay this game headlessly, as JSON-friendly data."""
+        return {
+            "version": 2,
+            "difficulty": self.difficulty,
+            "player_name": self.player_name,
+            "seed": self.seed,
+            "overrides": self.overrides,
+            "hitboxes": [[icon, size, hb.left, hb.top, hb.right, hb.bottom, hb.rows]
+                         for (icon, size), hb in self.hitboxes.items()],
+            "inputs": self.inputs,
+            "checkpoints": self.checkpoints,
+            "outcome": {"state": self.state, "ticks": self.ticks, "score": self.score, "player_hp": self.player_hp},
+        }
+
+    def hpFraction(self):
+        """Share of the wave still standing, drives the emitter phases."""
+        if self.swarm is not None:
+            return self.swarm.remaining / max(1, self.swarm.count)
+        if self.is_boss:
+            return sum(e.hp for e in self.enemies) / max(1, self.enemy_hp)
+        return len(self.enemies) / max(1, self.enemies_per_wave)
+
+    def updateGame(self):
+        if self.state != "playing":
+            return
+
+        if self.swarm is not None:
+            self.updateSwarm()
+        else:
+            self.updateEnemies()
+        if self.state != "playing":
+            return
+        self.updateEnemyBullets()
+
+    def moveBullet(self, bullet):
+        """Advances one player bullet. Returns False when it left the top and was despawned."""
+        bullet.prev_x = bullet.x
+        bullet.prev_y = bullet.y
+        bullet.x += bullet.dx * bullet.speed
+        bullet.y += bullet.dy * bullet.speed
+        if bullet.y < 0:
+            self.despawn(self.bullets, bullet)
+            return False
+        return True
+
+    def moveBullets(self):
+        # Walk backwards so swap-remove never skips a bullet
+        bullets = self.bullets.active
+        for i in range(len(bullets) - 1, -1, -1):
+            self.moveBullet(bullets[i])
+
+    def updateSwarm(self):
+        swarm = self.swarm
+        self.moveBullets()
+
+        bullets = self.bullets.active
+        pairs = swarm.hitTest([b.x for b in bullets], [b.y for b in bullets], BULLET_WIDTH, BULLET_HEIGHT)
+        for bullet, index in [(bullets[b], e) for b, e in pairs]:
+            if not swarm.alive[index]:
+                continue
+            if self.pixel_perfect and not swarm.hitbox.maskHit(bullet.x - swarm.x[index], bullet.y - swarm.y[index], bullet.width, bullet.height):
+                continue
+            self.score += 20 if swarm.hit(index) else 5
+            self.despawn(self.bullets, bullet)
+
+        if not swarm.remaining:
+            self.state = "won"
+            return
+        if swarm.march(self.speed_enemy, self.enemy_step_down) and swarm.reached(self.rocket.y):
+            self.state = "lost"
+
+    def updateEnemies(self):
+        # Bullet movement (walk backwards so swap-remove never skips a bullet)
+        bullets = self.bullets.active
+        for i in range(len(bullets) - 1, -1, -1):
+            bullet = bullets[i]
+            if not self.moveBullet(bullet):
+                continue
+
+            for enemy in self.enemy_grid.query(bullet.x, bullet.y, bullet.width, bullet.height):
+                if hits(bullet, enemy, self.pixel_perfect):
+                    if enemy.hit():
+                        self.despawn(self.enemies, enemy, self.enemy_grid)
+                        self.score += 20 if not self.is_boss else 100 # Boss score
+                    else:
+                        self.score += 5
+                    self.despawn(self.bullets, bullet)
+                    break
+
+        # Enemy movement
+        if not self.enemies:
+            self.state = "won"
+            return
+
+        grid = self.enemy_grid
+        if not self.is_boss:
+            move_down = False
+            for e in self.enemies:
+                e.prev_x = e.x
+                e.prev_y = e.y
+                e.x += self.speed_enemy * self.enemy_direction
+                grid.move(e)
+                if e.x <= 0 or e.x + 40 >= SCENE_WIDTH:
+                    move_down = True
+
+            if move_down:
+                self.enemy_direction *= -1
+                for e in self.enemies:
+                    e.y += self.enemy_step_down
+                    grid.move(e)
+                    if e.y + e.height >= self.rocket.y:
+                        self.state = "lost"
+                        return
+        else:
+            boss = self.enemies[0]
+            boss.prev_x = boss.x
+            boss.x += BOSS_SPEED * boss.direction_x
+            grid.move(boss)
+
+            if boss.x <= 0 or boss.x + boss.width >= SCENE_WIDTH:
+                boss.direction_x *= -1
+
+    def updateEnemyBullets(self):
+        # One batched step for every enemy bullet, then one rect test against the rocket
+        field = self.enemy_bullets
+        field.step(-BULLET_WIDTH, -BULLET_HEIGHT, SCENE_WIDTH, SCENE_HEIGHT)
+
+        rocket = self.rocket
+        hb = rocket.hitbox
+        hit = field.hitRect(rocket.x + hb.left, rocket.y + hb.top, rocket.x + hb.right, rocket.y + hb.bottom)
+        if hit and self.pixel_perfect:
+            hit = [i for i in hit if hb.maskHit(field.x[i] - rocket.x, field.y[i] - rocket.y, field.width, field.height)]
+        if hit:
+            field.remove(hit)
+            self.player_hp -= len(hit)
+            if self.player_hp <= 0:
+                self.state = "lost"
+
+    def enemyShoot(self, pattern_name=None):
+        """Fire one pattern (by default the next one in the active phase) from every enemy."""
+        if self.state != "playing":
+            return
+        pattern = PATTERNS[pattern_name or self.emitters.current()]
+        chance = pattern.get("chance", 1.0)
+
+        if self.swarm is not None:
+            swarm = self.swarm
+            offset = swarm.size / 2 - BULLET_WIDTH / 2
+            origins = [(float(swarm.x[i]) + offset, float(swarm.y[i]) + swarm.size)
+                       for i in swarm.shooters(chance, SCENE_HEIGHT)]
+        elif self.is_boss:
+            origins = [(e.x + 40, e.y + 60) for e in self.enemies]
+        else:
+            origins = [(e.x + 17, e.y + 35) for e in self.enemies if chance >= 1.0 or self.rng.random() < chance]
+
+        rocket = self.rocket
+        target = (rocket.x + rocket.width / 2, rocket.y + rocket.height / 2)
+        spin = self.emitters.spin
+        if pattern["kind"] == "spiral":
+            self.emitters.spin += pattern["spin"]
+        for origin in origins:
+            vxs, vys = patternVelocities(pattern, self.enemy_bullet_speed, origin, target, spin)
+            self.enemy_bullets.emit(origin[0], origin[1], vxs, vys)
+
+# ----------------------------------------Loop----------------------------------------
+class GameLoop:
+    """Fixed-timestep driver. Real time goes into an accumulator and is paid out in whole steps.
+
+    At most max_steps run per advance(); any backlog beyond that is dropped instead of
+    letting a stalled host snowball into ever longer catch-up frames.
+    """
+
+    def __init__(self, step, step_ms, max_steps=MAX_CATCHUP_STEPS):
+        self.step = step
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.steps = 0
+        self.dropped_ms = 0.0
+
+    def advance(self, elapsed_ms):
+        self.accumulator += elapsed_ms
+        steps = 0
+        while self.accumulator >= self.step_ms and steps < self.max_steps:
+            self.step()
+            self.accumulator -= self.step_ms
+            steps += 1
+        if self.accumulator >= self.step_ms:
+            backlog = self.accumulator - self.accumulator % self.step_ms
+            self.dropped_ms += backlog
+            self.accumulator -= backlog
+        self.steps += steps
+        return steps
+
+    def alpha(self):
+        """How far (0-1) real time is between the last step and the next one."""
+        return self.accumulator / self.step_ms
+
+    def reset(self):
+        self.accumulator = 0.0
@@ -0,0 +1,91 @@
+from spaceGame.gameUtil import loadNumpy
+
+# Set by the first SwarmFormation (see gameUtil.loadNumpy)
+np = None
+
+# ----------------------------------------Swarm Formation----------------------------------------
+class SwarmFormation:
+    """Hundreds to thousands of enemies held as NumPy arrays instead of SimEnemy objects.
+
+    The whole formation marches like the classic wave: when any live enemy touches a side
+    wall every direction flips and everyone steps down. Waves taller than the screen start
+    above it and march into view.
+    """
+
+    def __init__(self, count, hp, icon, size, hitbox, seed, scene_width=400, spacing=None, top=10):
+        global np
+        np = loadNumpy()
+        if np is None:
+            raise ImportError("Swarm mode needs numpy")
+        self.count = count
+        self.icon = icon
+        self.size = size
+        self.hitbox = hitbox
+        self.scene_width = scene_width
+        self.rng = np.random.default_rng(seed)
+
+        spacing = spacing or size + 2
+        # Leave ~30% of the width free so the wave has room to march before stepping down
+        columns = max(1, int(scene_width * 0.7 // spacing))
+        index = np.arange(count)
+        self.row = index // columns
+        rows = int(self.row[-1]) + 1 if count else 0
+        self.x = (index % columns) * float(spacing) + (scene_width - columns * spacing) / 2.0
+        # The last row sits at `top`, earlier rows stack upwards off screen
+        self.y = top - (rows - 1 - self.row) * float(spacing)
+        self.prev_x = self.x.copy()
+        self.prev_y = self.y.copy()
+        self.hp = np.full(count, hp, dtype=np.int32)
+        self.dx = np.ones(count)
+        self.alive = np.ones(count, dtype=bool)
+        self.remaining = count
+
+    def __len__(self):
+        return self.remaining
+
+    def march(self, speed, step_down):
+        """Move every live enemy, flipping and stepping down on a wall hit. Returns True on a step-down."""
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+        alive = self.alive
+        self.x += speed * self.dx * alive
+        if not np.any(alive & ((self.x <= 0) | (self.x + self.size >= self.scene_width))):
+            return False
+        self.dx *= -1
+        self.y += step_down
+        return True
+
+    def reached(self, limit_y):
+        return bool(np.any(self.alive & (self.y + self.size >= limit_y)))
+
+    def hitTest(self, bx, by, bw, bh):
+        """AABB test of every bullet against every live enemy hitbox in one broadcast.
+
+        Returns (bullet, enemy) index pairs, at most one per bullet (the lowest enemy index).
+        """
+        if not len(bx) or not self.remaining:
+            return []
+        hb = self.hitbox
+        bx = np.asarray(bx)[:, None]
+        by = np.asarray(by)[:, None]
+        hit = (self.alive &
+               (bx < self.x + hb.right) & (self.x + hb.left < bx + bw) &
+               (by < self.y + hb.bottom) & (self.y + hb.top < by + bh))
+        bullets = np.nonzero(hit.any(axis=1))[0]
+        return [(int(b), int(hit[b].argmax())) for b in bullets]
+
+    def hit(self, index):
+        """One point of damage. Returns True when it killed the enemy."""
+        self.hp[index] -= 1
+        if self.hp[index] > 0:
+            return False
+        self.alive[index] = False
+        self.remaining -= 1
+        return True
+
+    def visible(self, scene_height):
+        return np.nonzero(self.alive & (self.y + self.size > 0) & (self.y < scene_height))[0]
+
+    def shooters(self, chance, scene_height):
+        candidates = self.visible(scene_height)
+        return candidates[self.rng.random(len(candidates)) < chance]
@@ -1,60 +1,79 @@
 from spaceGame.gameUtil import getMayaWindow, RESOURCES_PATH, DIFFICULT
+from spaceGame.gameSim import GameWorld, GameLoop, SimEnemy, SimBoss, difficultySettings, ROCKET_ICON, ROCKET_SIZE, ENEMY_SIZE, BOSS_SIZE
+from spaceGame.gameAssets import SPRITES, BACKGROUNDS
+from spaceGame.gamePerf import FrameBudget, GameMetrics, ProfilerCapture
+from spaceGame.gameRender import BatchRenderer, BULLET_COLORS, RENDER_PROFILES, applyProfile, preblend
+from spaceGame.gameScores import SCORES
+from spaceGame import gameReplay
 try:
     from PySide6 import QtCore, QtGui, QtWidgets
 except ImportError:
     from PySide2 import QtCore, QtGui, QtWidgets
 
-import os, random, math
+import os, time
 
 # ----------------------------------------Global UI References----------------------------------------
 ui = None
 gameui = None
 
+def isAlive(widget):
+    """False for None and for wrappers whose C++ widget is gone (e.g. Maya closed its parent)."""
+    try:
+        widget.isVisible()
+        return True
+    except (AttributeError, RuntimeError):
+        return False
+
 def showMainMenu():
+    # Both windows are built once and then only hidden/shown again
     global ui
-    try:
-        if gameui:
-            gameui.close()
-    except Exception:
-        pass
-        
-    try:
-        if ui:
-            ui.close()
-    except Exception:
-        pass
-        
-    ptr = getMayaWindow()
-    ui = SpaceInvaderICT(parent=ptr)
+    if not isAlive(ui):
+        ptr = getMayaWindow()
+        ui = SpaceInvaderICT(parent=ptr)
     ui.show()
+    ui.raise_()
+
+    # Closed after the menu is up, so a standalone app never sees its last window close
+    if isAlive(gameui):
+        gameui.close()
 
 def run():
     showMainMenu()
 
 # ----------------------------------------Game Objects----------------------------------------
+# "items": one QGraphicsItem per entity; "batch": one layer item per entity kind (gameRender)
+RENDER_MODE = "items"
+# View/scene setup, one of gameRender.RENDER_PROFILES; F4 cycles through them in game
+RENDER_PROFILE = "default"
+# Set to a .csv or .jsonl path to log every frame's counters (see gamePerf.GameMetrics)
+METRICS_PATH = None
+# How often the HUD text and the scene item count refresh
+HUD_INTERVAL_MS = 250
+# F9 / Shift+F9 profiler captures land here
+PROFILE_PATH = os.path.join(os.path.dirname(RESOURCES_PATH), "profiles").replace("\\", "/")
+# Every finished game is saved here for gameReplay; only the newest REPLAY_KEEP are kept
+REPLAY_PATH = os.path.join(os.path.dirname(RESOURCES_PATH), "replays").replace("\\", "/")
+REPLAY_KEEP = 20
+# Rows of the menu's leaderboard
+BOARD_SIZE = 5
+# Game keys -> GameWorld input events (press; the release is the lower-case event)
+INPUT_KEYS = {QtCore.Qt.Key_Left: "L", QtCore.Qt.Key_Right: "R", QtCore.Qt.Key_Space: "S"}
+
 class Rocket(QtWidgets.QGraphicsPixmapItem):
     def __init__(self, player_name="Player"):
         super().__init__()
         self.setZValue(10)
-        img_path = os.path.join(RESOURCES_PATH, "icons", "mc.png")
-        if os.path.exists(img_path):
-            self.setPixmap(QtGui.QPixmap(img_path).scaled(40, 40, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation))
-        else:
-            self.setPixmap(QtGui.QPixmap(40, 40))
+        self.setPixmap(SPRITES.get(ROCKET_ICON, ROCKET_SIZE))
         self.nameItem = QtWidgets.QGraphicsSimpleTextItem(player_name)
         self.nameItem.setBrush(QtGui.QBrush(QtCore.Qt.white))
         self.nameItem.setParentItem(self)
         self.nameItem.setPos(0, -20)
 
 class Enemy(QtWidgets.QGraphicsPixmapItem):
-    def __init__(self, x, y, hp=1, icon_filename="zombie.png"):
+    def __init__(self, x, y, hp=1, icon_filename="zombie.png", size=ENEMY_SIZE):
         super().__init__()
         self.hp = hp
-        img_path = os.path.join(RESOURCES_PATH, "icons", icon_filename)
-        if os.path.exists(img_path):
-            self.setPixmap(QtGui.QPixmap(img_path).scaled(35, 35, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation))
-        else:
-            self.setPixmap(QtGui.QPixmap(35, 35))
+        self.setPixmap(SPRITES.get(icon_filename, size))
         self.setPos(x, y)
         self.hpLabel = QtWidgets.QGraphicsSimpleTextItem(str(hp))
         self.hpLabel.setBrush(QtGui.QBrush(QtCore.Qt.yellow))
@@ -62,22 +81,14 @@ class Enemy(QtWidgets.QGraphicsPixmapItem):
         self.hpLabel.setPos(10, -15)
         self.setZValue(5)
 
-    def hit(self):
-        self.hp -= 1
-        if self.hp > 0:
-            self.hpLabel.setText(str(self.hp))
-            return False
-        return True
+    def setHp(self, hp):
+        if hp != self.hp:
+            self.hp = hp
+            self.hpLabel.setText(str(hp))
 
 class Boss(Enemy):
     def __init__(self, x, y, hp=100, icon_filename="the witch.png"):
-        super().__init__(x, y, hp, icon_filename)
-        img_path = os.path.join(RESOURCES_PATH, "icons", icon_filename)
-        if os.path.exists(img_path):
-            self.setPixmap(QtGui.QPixmap(img_path).scaled(100, 100, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation))
-        else:
-            self.setPixmap(QtGui.QPixmap(100, 100))
-        self.hpLabel.setText(str(hp))
+        super().__init__(x, y, hp, icon_filename, size=BOSS_SIZE)
         self.setZValue(6)
 
 class Bullet(QtWidgets.QGraphicsRectItem):
@@ -86,60 +97,177 @@ class Bullet(QtWidgets.QGraphicsRectItem):
         self.setPos(x, y)
         self.direction = direction
         self.speed = speed
+        self.color = color
         self.setBrush(QtGui.QBrush(color))
         self.setZValue(2)
 
+    def setColor(self, color):
+        if color != self.color:
+            self.color = color
+            self.setBrush(QtGui.QBrush(color))
+
+class BulletItemPool:
+    """Hidden Bullet items that stay in the scene and get reused instead of added/removed per shot."""
+
+    def __init__(self, scene, capacity=64):
+        self.scene = scene
+        self.free = []
+        self.capacity = 0
+        self.active = 0
+        self.high_water = 0
+        self.grow(capacity)
+
+    def grow(self, count):
+        for i in range(count):
+            item = Bullet(0, 0)
+            item.hide()
+            self.scene.addItem(item)
+            self.free.append(item)
+        self.capacity += count
+
+    def acquire(self, x, y, color):
+        if not self.free:
+            self.grow(self.capacity or 16)
+        item = self.free.pop()
+        item.setColor(color)
+        item.setPos(x, y)
+        item.show()
+        self.active += 1
+        if self.active > self.high_water:
+            self.high_water = self.active
+        return item
+
+    def release(self, item):
+        item.hide()
+        self.free.append(item)
+        self.active -= 1
+
+    def stats(self):
+        return {"capacity": self.capacity, "active": self.active, "high_water": self.high_water}
+
+# ----------------------------------------End Screen----------------------------------------
+class EndScreen(QtWidgets.QGraphicsRectItem):
+    """Victory / game-over panel drawn over the scene. Built once, shown at the end of every game."""
+
+    def __init__(self, on_play_again, on_menu):
+        super().__init__(0, 0, 400, 550)
+        self.setBrush(QtGui.QBrush(QtGui.QColor(0, 0, 0, 170)))
+        self.setPen(QtGui.QPen(QtCore.Qt.NoPen))
+        self.setZValue(100)
+
+        self.title = QtWidgets.QGraphicsSimpleTextItem(self)
+        self.title.setBrush(QtGui.QBrush(QtGui.QColor("#ff7f50")))
+        font = QtGui.QFont("Fredoka One", 28)
+        self.title.setFont(font)
+        self.message = QtWidgets.QGraphicsSimpleTextItem(self)
+        self.message.setBrush(QtGui.QBrush(QtGui.QColor("#ffd")))
+        self.message.setFont(QtGui.QFont("Fredoka One", 12))
+
+        self.buttons = []
+        for i, (text, slot) in enumerate((("PLAY AGAIN (Enter)", on_play_again), ("MENU (Esc)", on_menu))):
+            button = QtWidgets.QPushButton(text)
+            # Proxied widgets don't inherit the dialog's style sheet
+            button.setStyleSheet("QPushButton { background-color: #ff6600; border: 2px solid #ffb347; color: #2b003d;"
+                                 " padding: 6px 10px; border-radius: 6px; font-weight: bold; }"
+                                 " QPushButton:hover { background-color: #9b30ff; color: #ffd700; }")
+            button.setFocusPolicy(QtCore.Qt.NoFocus)
+            button.clicked.connect(slot)
+            proxy = QtWidgets.QGraphicsProxyWidget(self)
+            proxy.setWidget(button)
+            self.buttons.append(proxy)
+        self.hide()
+
+    def showResult(self, title, message):
+        self.title.setText(title)
+        self.message.setText(message)
+        width = self.rect().width()
+        self.title.setPos((width - self.title.boundingRect().width()) / 2, 170)
+        self.message.setPos((width - self.message.boundingRect().width()) / 2, 230)
+        y = 300
+        for proxy in self.buttons:
+            proxy.setPos((width - proxy.size().width()) / 2, y)
+            y += proxy.size().height() + 10
+        self.show()
+
+# ----------------------------------------Game View----------------------------------------
+class GameView(QtWidgets.QGraphicsView):
+    def __init__(self, scene, parent=None):
+        super().__init__(scene, parent)
+        # Cost of the last repaint; the frame budget reads and clears it
+        self.last_paint_ms = 0.0
+        self.painted_at = 0.0
+        # Pre-blended background, drawn here by profiles that keep it out of the scene
+        self.background = None
+
+    def setBackgroundPixmap(self, pixmap):
+        if pixmap is not self.background:
+            self.background = pixmap
+            self.resetCachedContent()
+
+    def drawBackground(self, painter, rect):
+        super().drawBackground(painter, rect)
+        if self.background is not None:
+            painter.drawPixmap(0, 0, self.background)
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        super().paintEvent(event)
+        self.painted_at = time.perf_counter()
+        self.last_paint_ms += (self.painted_at - start) * 1000.0
+
+# ----------------------------------------Replay Saving----------------------------------------
+class _SaveReplayTask(QtCore.QRunnable):
+    def __init__(self, writer, recording, path, keep):
+        super().__init__()
+        self.writer = writer
+        self.recording = recording
+        self.path = path
+        self.keep = keep
+
+    def run(self):
+        directory = os.path.dirname(self.path)
+        try:
+            gameReplay.save(self.recording, self.path)
+            replays = sorted(name for name in os.listdir(directory) if name.startswith("replay_"))
+            for name in replays[:-self.keep]:
+                os.remove(os.path.join(directory, name))
+        except OSError as e:
+            self.writer.failed.emit(str(e))
+            return
+        self.writer.saved.emit(self.path)
+
+class ReplayWriter(QtCore.QObject):
+    """Writes finished games' recordings and prunes old ones on one worker thread, in order."""
+
+    saved = QtCore.Signal(str)
+    failed = QtCore.Signal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.pool = QtCore.QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.saved.connect(lambda path: print(f"[spaceGame] replay -> {path}"))
+        self.failed.connect(lambda error: print(f"[spaceGame] replay not saved: {error}"))
+
+    def save(self, recording, path, keep=REPLAY_KEEP):
+        self.pool.start(_SaveReplayTask(self, recording, path, keep))
+
+    def wait(self, msecs=2000):
+        """Blocks until queued replays are on disk, e.g. before a standalone app exits."""
+        return self.pool.waitForDone(msecs)
+
+REPLAYS = ReplayWriter()
+
 # ----------------------------------------Game Window----------------------------------------
 class GameWindow(QtWidgets.QDialog):
-    def __init__(self, player_name="Player", difficulty="Easy", parent=None):
+    """One long-lived game window. reset() starts a new game in place, reusing the scene,
+    the background, the pooled items and the timer; the end screen is drawn in the scene."""
+
+    def __init__(self, player_name="Player", difficulty="Easy", parent=None, render_mode=None, seed=None,
+                 render_profile=None, **overrides):
         super().__init__(parent)
-        self.setWindowTitle(f"SPACE INVADER: {difficulty}")
         self.resize(450, 600)
         self.setFocusPolicy(QtCore.Qt.StrongFocus)
-        
-        self.enemy_icon = "zombie.png"
-        self.enemies_per_wave = 6
-        self.player_bullet_color = QtCore.Qt.green
-        self.enemy_bullet_color = QtCore.Qt.red
-        self.enemy_bullet_speed = 6
-        self.player_hp = 3
-        
-        self.speed_enemy = 1
-        self.timer_interval = 30
-        self.enemy_hp = 1
-        self.is_boss = False
-        
-        bg_filename = "easy_bg.jpg"
-        opacity_level = 0.5
-        
-        if difficulty == "Easy":
-            self.enemy_icon = "zombie.png"
-            self.enemies_per_wave = 6
-        elif difficulty == "Normal":
-            bg_filename = "normal_bg.jpg"
-            self.speed_enemy = 2
-            self.enemy_hp = 2
-            self.enemy_icon = "mummy.png"
-            self.enemies_per_wave = 8
-            self.enemy_bullet_speed = 7
-        elif difficulty == "Hard":
-            bg_filename = "hard_bg.jpg"
-            self.speed_enemy = 3
-            self.enemy_hp = 2
-            self.enemy_icon = "vampire.png"
-            self.enemies_per_wave = 10
-            self.enemy_bullet_speed = 8
-        elif difficulty == "Goddamn":
-            bg_filename = "goddamn_bg.jpg"
-            self.speed_enemy = 3
-            self.enemy_hp = 100
-            self.is_boss = True
-            self.enemy_icon = "the witch.png"
-            self.enemies_per_wave = 1
-            opacity_level = 0.3
-            self.player_hp = 2
-            self.enemy_bullet_speed = 8
-            self.enemy_bullet_color = QtCore.Qt.magenta
 
         # ----------------------------------------UI Setup (Style Sheet)----------------------------------------
         self.setStyleSheet("""
@@ -204,28 +332,16 @@ class GameWindow(QtWidgets.QDialog):
 
         # ----------------------------------------Scene and View Setup----------------------------------------
         self.scene = QtWidgets.QGraphicsScene(0, 0, 400, 550)
-        self.view = QtWidgets.QGraphicsView(self.scene, self)
+        self.view = GameView(self.scene, self)
 
         # ----------------------------------------Background Setup----------------------------------------
-        bg_path = os.path.join(RESOURCES_PATH, "images", bg_filename)
-        
-        if os.path.exists(bg_path):
-            pixmap = QtGui.QPixmap(bg_path)
-            
-            scaled_pixmap = pixmap.scaled(
-                400, 
-                550, 
-                QtCore.Qt.IgnoreAspectRatio,  
-                QtCore.Qt.SmoothTransformation
-            )
-            
-            background_item = QtWidgets.QGraphicsPixmapItem(scaled_pixmap)
-            background_item.setPos(0, 0)
-            background_item.setOpacity(opacity_level)
-            background_item.setZValue(-1)
-            self.scene.addItem(background_item)
-        else:
-            self.scene.setBackgroundBrush(QtGui.QBrush(QtGui.QColor(43, 0, 61)))
+        # Flat fallback until the worker thread has decoded and scaled the JPEG
+        self.scene.setBackgroundBrush(QtGui.QBrush(QtGui.QColor(43, 0, 61)))
+        self.background_item = None
+        self.view_background = None
+        self.bg_key = None
+        self.shown_bg_key = None
+        self.render_profile = None
 
         layout = QtWidgets.QVBoxLayout(self)
         layout.addWidget(self.view)
@@ -233,180 +349,456 @@ class GameWindow(QtWidgets.QDialog):
         # ----------------------------------------Labels----------------------------------------
         labelLayout = QtWidgets.QHBoxLayout()
         self.scoreLabel = QtWidgets.QLabel("Score: 0")
-        self.hpLabel = QtWidgets.QLabel(f"HP: {self.player_hp}")
+        self.hpLabel = QtWidgets.QLabel()
         labelLayout.addWidget(self.scoreLabel)
         labelLayout.addStretch()
         labelLayout.addWidget(self.hpLabel)
         layout.addLayout(labelLayout)
 
-        # ----------------------------------------Game Initialization----------------------------------------
-        self.player_name = player_name
+        # ----------------------------------------Scene Items----------------------------------------
         self.rocket = Rocket(player_name)
-        self.rocket.setPos(180, 500)
         self.scene.addItem(self.rocket)
 
-        self.bullets = []
-        self.enemy_bullets = []
-        self.score = 0
-        self.key_left = self.key_right = False
-
-        self.createEnemies()
-
-        # ----------------------------------------Timers----------------------------------------
-        self.gameTimer = QtCore.QTimer()
-        self.gameTimer.timeout.connect(self.updateGame)
-        self.gameTimer.start(self.timer_interval)
-
-        self.moveTimer = QtCore.QTimer()
-        self.moveTimer.timeout.connect(self.moveRocket)
-        self.moveTimer.start(16)
-
-        self.enemyShootTimer = QtCore.QTimer()
-        self.enemyShootTimer.timeout.connect(self.enemyShoot)
-        self.enemyShootTimer.setInterval(250 if self.is_boss else 1000)
-        self.enemyShootTimer.start()
-
-    def createEnemies(self):
-        self.enemies = []
-        self.enemy_direction = 1
-        self.enemy_step_down = 10
-
-        if self.is_boss:
-            boss = Boss(150, 50, self.enemy_hp, icon_filename=self.enemy_icon)
-            self.scene.addItem(boss)
-            self.enemies.append(boss)
-            if not hasattr(boss, "direction_x"):
-                boss.direction_x = 1
+        # Sim entity -> QGraphicsItem; enemy bullets live in a field and map slot -> item instead
+        self.items = {}
+        self.enemyBulletItems = []
+        # Hidden Enemy/Boss items from earlier waves, keyed by (class, icon, size)
+        self.spareEnemies = {}
+        self.batch = None
+        self.bulletItems = None
+
+        self.endScreen = EndScreen(self.playAgain, self.backToMenu)
+        self.scene.addItem(self.endScreen)
+
+        # ----------------------------------------Game Loop----------------------------------------
+        # One timer drives everything: the world advances in fixed steps of timer_interval
+        # (shooting is scheduled in simulation time) and frames interpolate between steps.
+        self.render_interval = 16
+        self.frameTimer = QtCore.QTimer()
+        self.frameTimer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.frameTimer.timeout.connect(self.runFrame)
+        self.loop = None
+
+        # ----------------------------------------Frame Budget----------------------------------------
+        self.budget = FrameBudget(budget_ms=self.render_interval)
+
+        # ----------------------------------------Metrics / HUD (F3)----------------------------------------
+        self.metrics = GameMetrics(path=METRICS_PATH)
+        self.scene_items = len(self.scene.items())
+        self.hud_clock = 0.0
+        self.hud = QtWidgets.QLabel(self.view)
+        self.hud.setStyleSheet("background-color: rgba(0, 0, 0, 160); color: #7fff7f; font-family: monospace; font-size: 10px; font-weight: normal; padding: 3px;")
+        self.hud.move(4, 4)
+        self.hud.hide()
+        self.hud_status = ""
+
+        # ----------------------------------------Profiler (F9, Shift+F9 adds tracemalloc)----------------------------------------
+        self.capture = ProfilerCapture(PROFILE_PATH)
+
+        self.setRenderProfile(render_profile or RENDER_PROFILE)
+        BACKGROUNDS.ready.connect(self.onBackgroundReady)
+        self.reset(difficulty, player_name, render_mode, seed, **overrides)
+
+    def reset(self, difficulty=None, player_name=None, render_mode=None, seed=None, **overrides):
+        """Starts a new game in this window. Leaving difficulty/player_name out replays the last setup."""
+        if difficulty is None:
+            difficulty, player_name, render_mode, overrides = self.game_setup
+        self.game_setup = (difficulty, player_name or "Player", render_mode, overrides)
+        player_name = self.game_setup[1]
+        self.frameTimer.stop()
+        self.endScreen.hide()
+        self.clearItems()
+
+        self.difficulty = difficulty
+        self.player_name = player_name
+        self.setWindowTitle(f"SPACE INVADER: {difficulty}")
+        settings = difficultySettings(difficulty, **overrides)
+        # Bullet-hell difficulties default to the batch layers, they can't keep up otherwise. A swarm
+        # always renders batched: its wave lives in SwarmFormation arrays that only the batch layers
+        # draw, so item mode would leave it invisible.
+        if settings["swarm"]:
+            if render_mode not in (None, "batch"):
+                print(f"[spaceGame] render_mode {render_mode!r} can't draw a swarm, using 'batch'")
+            self.render_mode = "batch"
+        else:
+            self.render_mode = render_mode or settings["render_mode"] or RENDER_MODE
+
+        # ----------------------------------------World (simulation state)----------------------------------------
+        enemy_size = BOSS_SIZE if settings["is_boss"] else settings["enemy_size"]
+        sprites = [(ROCKET_ICON, ROCKET_SIZE), (settings["enemy_icon"], enemy_size)]
+        SPRITES.preload(sprites)
+        hitboxes = {sprite: SPRITES.hitbox(*sprite) for sprite in sprites}
+        self.world = GameWorld(difficulty, player_name, hitboxes=hitboxes, seed=seed, **overrides)
+
+        self.is_boss = settings["is_boss"]
+        self.timer_interval = settings["timer_interval"]
+
+        # ----------------------------------------Renderer----------------------------------------
+        if self.render_mode == "batch":
+            if self.batch is None:
+                self.batch = BatchRenderer(self.scene)
         else:
-            for i in range(self.enemies_per_wave):
-                x = random.randint(0, 365)
-                y = random.randint(0, 200)
-                e = Enemy(x, y, self.enemy_hp, icon_filename=self.enemy_icon)
-                self.scene.addItem(e)
-                self.enemies.append(e)
+            if self.batch is not None:
+                self.batch.remove()
+                self.batch = None
+            if self.bulletItems is None:
+                self.bulletItems = BulletItemPool(self.scene, settings["bullet_pool_size"] * 2)
+
+        # ----------------------------------------Background----------------------------------------
+        self.bg_key = BACKGROUNDS.request(settings["bg_filename"], 400, 550, settings["opacity_level"])
+
+        self.rocket.nameItem.setText(player_name)
+        self.rocket.setPos(self.world.rocket.x, self.world.rocket.y)
+        self.shown_score = 0
+        self.shown_hp = self.world.player_hp
+        self.scoreLabel.setText("Score: 0")
+        self.hpLabel.setText(f"HP: {self.world.player_hp}")
+
+        if self.loop is None:
+            self.loop = GameLoop(self.world.step, self.timer_interval)
+        else:
+            self.loop.step = self.world.step
+            self.loop.step_ms = self.timer_interval
+            self.loop.reset()
+        self.budget.reset()
+        # Input stamps applied by the world, waiting for the paint that shows them
+        self.latency_pending = []
+        self.latency_synced_at = 0.0
+        self.applyQuality(0)
+        self.onBackgroundReady(self.bg_key)
+        self.syncScene()
+
+        self.last_frame = time.perf_counter()
+        self.frameTimer.start(self.render_interval)
+
+    def clearItems(self):
+        """Returns every entity item of the previous game to its pool."""
+        for item in self.items.values():
+            self.releaseItem(item)
+        self.items.clear()
+        while self.enemyBulletItems:
+            self.bulletItems.release(self.enemyBulletItems.pop())
+
+    def onBackgroundReady(self, key):
+        if key != self.bg_key or key == self.shown_bg_key:
+            return
+        pixmap = BACKGROUNDS.pixmap(key)
+        if pixmap is None:
+            return
+        if self.profile["background"] == "view":
+            viewport = self.view.viewport()
+            self.view_background = preblend(pixmap, viewport.palette().color(viewport.backgroundRole()))
+        elif self.background_item is None:
+            self.background_item = QtWidgets.QGraphicsPixmapItem(pixmap)
+            self.background_item.setPos(0, 0)
+            self.background_item.setZValue(-1)
+            self.scene.addItem(self.background_item)
+        else:
+            self.background_item.setPixmap(pixmap)
+        self.shown_bg_key = key
+        self.applyQuality(self.budget.level)
 
     def keyPressEvent(self, event):
         key = event.key()
-        if key == QtCore.Qt.Key_Left:
-            self.key_left = True
-        elif key == QtCore.Qt.Key_Right:
-            self.key_right = True
-        elif key == QtCore.Qt.Key_Space:
-            # Bullet: ใช้สีจากตัวแปรที่ตั้งค่าไว้
-            bullet = Bullet(self.rocket.x() + 17, self.rocket.y() - 15, color=self.player_bullet_color)
-            self.scene.addItem(bullet)
-            self.bullets.append(bullet)
+        if self.endScreen.isVisible():
+            if key in (QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter):
+                self.playAgain()
+            elif key == QtCore.Qt.Key_Escape:
+                self.backToMenu()
+            return
+        if event.isAutoRepeat():
+            # Held keys stay held in the world; fire repeats at its cooldown instead
+            return
+        if key in INPUT_KEYS:
+            self.world.queueInput(INPUT_KEYS[key], time.perf_counter())
+        elif key == QtCore.Qt.Key_F3:
+            self.toggleHud()
+        elif key == QtCore.Qt.Key_F4:
+            self.cycleRenderProfile()
+        elif key == QtCore.Qt.Key_F9:
+            self.toggleCapture(memory=bool(event.modifiers() & QtCore.Qt.ShiftModifier))
 
     def keyReleaseEvent(self, event):
         key = event.key()
-        if key == QtCore.Qt.Key_Left:
-            self.key_left = False
-        elif key == QtCore.Qt.Key_Right:
-            self.key_right = False
-
-    def moveRocket(self):
-        if self.key_left:
-            self.rocket.setX(max(0, self.rocket.x() - 5))
-        if self.key_right:
-            self.rocket.setX(min(400 - self.rocket.pixmap().width(), self.rocket.x() + 5))
-
-    def updateGame(self):
-        # ----------------------------------------Bullet movement----------------------------------------
-        for bullet in self.bullets[:]:
-            bullet.setPos(bullet.x() + bullet.direction.x() * bullet.speed,
-                             bullet.y() + bullet.direction.y() * bullet.speed)
-            if bullet.y() < 0:
-                self.scene.removeItem(bullet)
-                self.bullets.remove(bullet)
-                continue
-
-            for enemy in self.enemies[:]:
-                if bullet.collidesWithItem(enemy):
-                    if enemy.hit():
-                        self.scene.removeItem(enemy)
-                        self.enemies.remove(enemy)
-                        self.score += 20 if not self.is_boss else 100 # Boss score
-                    else:
-                        self.score += 5
-                    self.scene.removeItem(bullet)
-                    self.bullets.remove(bullet)
-                    self.scoreLabel.setText(f"Score: {self.score}")
-                    break
-
-        # ----------------------------------------Enemy movement----------------------------------------
-        if not self.enemies:
-             self.winGame()
-             return
-
-        if not self.is_boss:
-            move_down = False
-            for e in self.enemies:
-                e.setX(e.x() + self.speed_enemy * self.enemy_direction)
-                if e.x() <= 0 or e.x() + 40 >= 400:
-                    move_down = True
-
-            if move_down:
-                self.enemy_direction *= -1
-                for e in self.enemies:
-                    e.setY(e.y() + self.enemy_step_down)
-                    if e.y() + e.pixmap().height() >= self.rocket.y():
-                        self.gameOver()
-                        return
+        if key in INPUT_KEYS and not event.isAutoRepeat():
+            self.world.queueInput(INPUT_KEYS[key].lower(), time.perf_counter())
+
+    def runFrame(self):
+        now = time.perf_counter()
+        elapsed_ms = (now - self.last_frame) * 1000.0
+        self.last_frame = now
+
+        latency_ms = self.inputLatency()
+
+        capture = self.capture
+        if capture.active:
+            capture.enable()
+        steps = self.loop.advance(elapsed_ms)
+        self.syncScene(self.loop.alpha())
+        if capture.active:
+            capture.disable()
+        applied = self.world.drainAppliedInputs()
+        if applied:
+            self.latency_pending.extend(applied)
+            self.latency_synced_at = time.perf_counter()
+
+        tick_ms = (time.perf_counter() - now) * 1000.0
+        paint_ms, self.view.last_paint_ms = self.view.last_paint_ms, 0.0
+        self.recordMetrics(elapsed_ms, tick_ms, paint_ms, steps, latency_ms)
+        level = self.budget.record(tick_ms, paint_ms)
+        if level is not None:
+            self.applyQuality(level)
+        if self.world.state == "won":
+            self.winGame()
+        elif self.world.state == "lost":
+            self.gameOver()
+
+    def inputLatency(self):
+        """Worst key event -> paint delay of the inputs shown since the last frame, or None.
+        An input counts as shown by the first repaint after the sync of the step that applied it."""
+        if not self.latency_pending or self.view.painted_at < self.latency_synced_at:
+            return None
+        painted_at = self.view.painted_at
+        latency_ms = max(painted_at - stamp for stamp in self.latency_pending) * 1000.0
+        self.latency_pending = []
+        return latency_ms
+
+    # ----------------------------------------Metrics / HUD----------------------------------------
+    def recordMetrics(self, frame_ms, tick_ms, paint_ms, steps, latency_ms=None):
+        world = self.world
+        now = time.perf_counter()
+        refresh = (now - self.hud_clock) * 1000.0 >= HUD_INTERVAL_MS
+        if refresh:
+            # scene.items() builds a list, so it is only counted a few times per second
+            self.hud_clock = now
+            self.scene_items = len(self.scene.items())
+        self.metrics.record(
+            frame_ms=round(frame_ms, 3),
+            tick_ms=round(tick_ms, 3),
+            paint_ms=round(paint_ms, 3),
+            jitter_ms=round(abs(frame_ms - self.frameTimer.interval()), 3),
+            steps=steps,
+            player_bullets=len(world.bullets),
+            enemy_bullets=len(world.enemy_bullets),
+            enemies=len(world.swarm) if world.swarm is not None else len(world.enemies),
+            scene_items=self.scene_items,
+            quality=self.budget.level,
+            **({} if latency_ms is None else {"input_latency_ms": round(latency_ms, 3)})
+        )
+        if refresh and self.hud.isVisible():
+            self.updateHud()
+
+    def toggleHud(self):
+        self.hud.setVisible(not self.hud.isVisible())
+        if self.hud.isVisible():
+            self.updateHud()
+
+    def updateHud(self):
+        m = self.metrics.summary()
+        self.hud.setText(
+            f"frame  {m['frame_ms']:5.1f} ms  p95 {m['frame_p95_ms']:5.1f}\n"
+            f"tick   {m['tick_ms']:5.2f} ms  paint {m['paint_ms']:5.2f}\n"
+            f"jitter {m['jitter_ms']:5.2f} ms  steps {m.get('steps', 0)}\n"
+            f"bullets {m.get('player_bullets', 0)}/{m.get('enemy_bullets', 0)}  enemies {m.get('enemies', 0)}\n"
+            f"items {self.scene_items}  quality {self.budget.levelName()}  {self.render_profile}"
+            + (f"\ninput  {m['input_latency_ms']:5.1f} ms  p95 {m['input_p95_ms']:5.1f}" if "input_latency_ms" in m else "")
+            + (f"\n{self.hud_status}" if self.hud_status else "")
+        )
+        self.hud.adjustSize()
+
+    def setHudStatus(self, text):
+        # Also printed, so it shows up in Maya's script editor
+        print(f"[spaceGame] {text}")
+        self.hud_status = text
+        self.hud.show()
+        self.updateHud()
+
+    def toggleCapture(self, memory=False):
+        if not self.capture.active:
+            self.capture.start(memory=memory)
+            self.setHudStatus("REC profile" + (" + tracemalloc" if memory else "") + " (F9 to stop)")
+            return
+        try:
+            prof_path, text_path = self.capture.stop()
+        except OSError as e:
+            self.setHudStatus(f"profile not written: {e}")
+            return
+        self.setHudStatus(f"profile -> {text_path}")
+
+    # ----------------------------------------Quality----------------------------------------
+    def applyQuality(self, level):
+        smooth = level < 1
+        self.transform_mode = QtCore.Qt.SmoothTransformation if smooth else QtCore.Qt.FastTransformation
+        self.show_hp_labels = level < 2
+        self.view.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, smooth)
+        self.rocket.setTransformationMode(self.transform_mode)
+        for item in self.items.values():
+            if isinstance(item, Enemy):
+                item.setTransformationMode(self.transform_mode)
+                item.hpLabel.setVisible(self.show_hp_labels)
+        if self.batch is not None:
+            self.batch.setQuality(smooth, self.show_hp_labels)
+
+        flat_background = level >= 3 or self.shown_bg_key != self.bg_key
+        if self.background_item is not None:
+            self.background_item.setVisible(not flat_background)
+        self.view.setBackgroundPixmap(None if flat_background else self.view_background)
+        self.scene.setBackgroundBrush(QtGui.QBrush(QtGui.QColor(43, 0, 61)) if flat_background else QtGui.QBrush())
+
+        self.frameTimer.setInterval(self.render_interval * 2 if level >= 4 else self.render_interval)
+
+    def setRenderProfile(self, name):
+        """Switches the view to one of gameRender.RENDER_PROFILES, also in the middle of a game."""
+        self.profile = applyProfile(self.view, self.scene, name)
+        self.render_profile = name
+        if self.profile["background"] == "view":
+            if self.background_item is not None:
+                self.scene.removeItem(self.background_item)
+                self.background_item = None
         else:
-            boss = self.enemies[0]
-            speed = 3 # Boss side speed
-            boss.setX(boss.x() + speed * boss.direction_x)
-
-            if boss.x() <= 0 or boss.x() + boss.pixmap().width() >= 400:
-                boss.direction_x *= -1
-
-        # ----------------------------------------Enemy bullets----------------------------------------
-        for b in self.enemy_bullets[:]:
-            b.setPos(b.x() + b.direction.x() * b.speed, b.y() + b.direction.y() * b.speed)
-            if b.y() > 550:
-                self.scene.removeItem(b)
-                self.enemy_bullets.remove(b)
-                continue
-            if b.collidesWithItem(self.rocket):
-                self.scene.removeItem(b)
-                self.enemy_bullets.remove(b)
-                self.player_hp -= 1
-                self.hpLabel.setText(f"HP: {self.player_hp}")
-                if self.player_hp <= 0:
-                    self.gameOver()
-                    return
-
-    def enemyShoot(self):
-        for e in self.enemies:
-            if self.is_boss:
-                for angle in [-0.5, -0.25, 0, 0.25, 0.5]:
-                    direction = QtCore.QPointF(angle, 1)
-                    b = Bullet(e.x() + 40, e.y() + 60, direction, self.enemy_bullet_speed, self.enemy_bullet_color)
-                    self.scene.addItem(b)
-                    self.enemy_bullets.append(b)
+            self.view_background = None
+            self.view.setBackgroundPixmap(None)
+        # Shows the current background again, the way this profile draws it
+        self.shown_bg_key = None
+        if self.bg_key is not None:
+            self.onBackgroundReady(self.bg_key)
+
+    def cycleRenderProfile(self):
+        names = list(RENDER_PROFILES)
+        self.setRenderProfile(names[(names.index(self.render_profile) + 1) % len(names)])
+        self.setHudStatus(f"render profile {self.render_profile} (F4 to switch)")
+
+    def qualityLevel(self):
+        return self.budget.level, self.budget.levelName()
+
+    # ----------------------------------------Rendering----------------------------------------
+    def createItem(self, entity):
+        if not isinstance(entity, SimEnemy):
+            return self.bulletItems.acquire(entity.x, entity.y, BULLET_COLORS.get(entity.color, QtCore.Qt.green))
+        cls = Boss if isinstance(entity, SimBoss) else Enemy
+        spares = self.spareEnemies.get((cls, entity.icon, entity.width))
+        if spares:
+            item = spares.pop()
+            item.setPos(entity.x, entity.y)
+            item.setHp(entity.hp)
+            item.show()
+        else:
+            if cls is Boss:
+                item = Boss(entity.x, entity.y, entity.hp, icon_filename=entity.icon)
             else:
-                if random.random() < 0.3:
-                    # ใช้ self.enemy_bullet_speed และ self.enemy_bullet_color
-                    b = Bullet(e.x() + 17, e.y() + 35, QtCore.QPointF(0,1), self.enemy_bullet_speed, self.enemy_bullet_color)
-                    self.scene.addItem(b)
-                    self.enemy_bullets.append(b)
+                item = Enemy(entity.x, entity.y, entity.hp, icon_filename=entity.icon, size=entity.width)
+            item.spare_key = (cls, entity.icon, entity.width)
+            self.scene.addItem(item)
+        item.setTransformationMode(self.transform_mode)
+        item.hpLabel.setVisible(self.show_hp_labels)
+        return item
+
+    def releaseItem(self, item):
+        if isinstance(item, Bullet):
+            self.bulletItems.release(item)
+        else:
+            # Kept hidden in the scene for the next wave instead of being rebuilt
+            item.hide()
+            self.spareEnemies.setdefault(item.spare_key, []).append(item)
+
+    def syncScene(self, alpha=1.0):
+        world = self.world
+        if self.batch is not None:
+            self.batch.sync(world, alpha)
+        else:
+            self.syncItems(alpha)
+
+        rocket = world.rocket
+        self.rocket.setPos(rocket.prev_x + (rocket.x - rocket.prev_x) * alpha, rocket.y)
+
+        if world.score != self.shown_score:
+            self.shown_score = world.score
+            self.scoreLabel.setText(f"Score: {world.score}")
+        if world.player_hp != self.shown_hp:
+            self.shown_hp = world.player_hp
+            self.hpLabel.setText(f"HP: {world.player_hp}")
+
+    def syncItems(self, alpha):
+        world = self.world
+        # Removals first: pooled sim bullets can be freed and re-acquired between two syncs
+        for entity in world.drainRemoved():
+            item = self.items.pop(entity, None)
+            if item is not None:
+                self.releaseItem(item)
+        for entity in world.drainSpawned():
+            if entity.alive and entity not in self.items:
+                self.items[entity] = self.createItem(entity)
+
+        # Interpolate between the last two simulation steps
+        for entity, item in self.items.items():
+            x = entity.prev_x + (entity.x - entity.prev_x) * alpha
+            y = entity.prev_y + (entity.y - entity.prev_y) * alpha
+            if item.x() != x or item.y() != y:
+                item.setPos(x, y)
+            if isinstance(item, Enemy):
+                item.setHp(entity.hp)
+        self.syncEnemyBullets(alpha)
+
+    def syncEnemyBullets(self, alpha):
+        # The field is dense and compacts every step, so slot i simply takes bullet i's position
+        field = self.world.enemy_bullets
+        items = self.enemyBulletItems
+        count = len(field)
+        while len(items) > count:
+            self.bulletItems.release(items.pop())
+        color = BULLET_COLORS.get(field.color, QtCore.Qt.green)
+        while len(items) < count:
+            items.append(self.bulletItems.acquire(0, 0, color))
+        xs, ys = field.positions(alpha)
+        for item, x, y in zip(items, xs, ys):
+            item.setPos(x, y)
+
+    def poolStats(self):
+        stats = self.world.poolStats()
+        if self.bulletItems is not None:
+            stats["items"] = self.bulletItems.stats()
+        return stats
 
     def winGame(self):
         self.stopTimers()
-        QtWidgets.QMessageBox.information(self, "Victory", f"You win, {self.player_name}! 🎉\nScore: {self.score}")
-        self.close()
-        showMainMenu()
+        self.saveReplay()
+        rank = SCORES.record(self.player_name, self.difficulty, self.world.score, True, self.world.ticks)
+        self.endScreen.showResult("Victory", f"You win, {self.player_name}! 🎉\nScore: {self.world.score}" + self.rankText(rank))
 
     def gameOver(self):
         self.stopTimers()
-        QtWidgets.QMessageBox.warning(self, "Game Over", f"{self.player_name}, you lost!\nFinal Score: {self.score}")
+        self.saveReplay()
+        rank = SCORES.record(self.player_name, self.difficulty, self.world.score, False, self.world.ticks)
+        self.endScreen.showResult("Game Over", f"{self.player_name}, you lost!\nFinal Score: {self.world.score}" + self.rankText(rank))
+
+    def rankText(self, rank):
+        return f"\n#{rank} on the {self.difficulty} board" if rank is not None and rank <= BOARD_SIZE else ""
+
+    def playAgain(self):
+        self.reset()
+        self.setFocus()
+
+    def backToMenu(self):
         self.close()
         showMainMenu()
 
+    def closeEvent(self, event):
+        self.stopTimers()
+        super().closeEvent(event)
+
+    def saveReplay(self):
+        """Queues the world's seed + input log for REPLAYS to write to REPLAY_PATH. Returns the path;
+        REPLAYS.saved / failed report the outcome."""
+        world = self.world
+        path = os.path.join(REPLAY_PATH, time.strftime("replay_%Y%m%d_%H%M%S") + f"{int(time.time() * 1000) % 1000:03d}_{world.difficulty}.json")
+        REPLAYS.save(world.recording(), path)
+        return path
+
     def stopTimers(self):
-        self.gameTimer.stop()
-        self.moveTimer.stop()
-        self.enemyShootTimer.stop()
+        self.frameTimer.stop()
+        self.metrics.flush()
+        if self.capture.active:
+            self.toggleCapture()
 
 # ----------------------------------------Main Menu----------------------------------------
 class SpaceInvaderICT(QtWidgets.QDialog):
@@ -425,11 +817,10 @@ class SpaceInvaderICT(QtWidgets.QDialog):
 
         # ----------------- Background image -----------------
         self.bgLabel = QtWidgets.QLabel(self)
-        bg_path = os.path.join(RESOURCES_PATH, "images", "halloween_bg.jpg")
-        if os.path.exists(bg_path):
-            pixmap = QtGui.QPixmap(bg_path)
-            self.bgLabel.setPixmap(pixmap)
-            self.bgLabel.setScaledContents(True)
+        self.bgLabel.setStyleSheet("background-color: #2b003d;")
+        self.bg_key = BACKGROUNDS.request("halloween_bg.jpg", 500, 500)
+        BACKGROUNDS.ready.connect(self.onBackgroundReady)
+        self.onBackgroundReady(self.bg_key)
         self.bgLabel.setGeometry(0, 0, self.width(), self.height())
         self.bgLabel.lower()
         self.resizeEvent = self._resizeEvent
@@ -462,6 +853,8 @@ class SpaceInvaderICT(QtWidgets.QDialog):
         # Difficulty selection
         self.diffCombo = QtWidgets.QComboBox()
         self.diffCombo.addItems(DIFFICULT)
+        self.diffCombo.currentTextChanged.connect(self.prefetchBackground)
+        self.prefetchBackground(self.diffCombo.currentText())
         self.diffCombo.setFont(self.customFont)
         self.diffCombo.setStyleSheet("""
             background-color: rgba(0,0,0,150);
@@ -472,6 +865,21 @@ class SpaceInvaderICT(QtWidgets.QDialog):
         """)
         mainLayout.addWidget(self.diffCombo)
 
+        # Leaderboard of the selected difficulty; the score log is read when the menu first shows
+        self.boardLabel = QtWidgets.QLabel()
+        self.boardLabel.setFont(QtGui.QFont("Fredoka One", 11))
+        self.boardLabel.setStyleSheet("""
+            background-color: rgba(0,0,0,120);
+            color: #FFD27F;
+            border: 1px solid #AA00FF;
+            border-radius: 6px;
+            padding: 4px;
+        """)
+        self.diffCombo.currentTextChanged.connect(self.updateBoard)
+        SCORES.changed.connect(self.updateBoard)
+        self.updateBoard()
+        mainLayout.addWidget(self.boardLabel)
+
         # Start button
         self.startButton = QtWidgets.QPushButton("START")
         self.startButton.setFont(self.customFont)
@@ -522,6 +930,32 @@ class SpaceInvaderICT(QtWidgets.QDialog):
         mainLayout.addStretch()
 
 
+    def onBackgroundReady(self, key):
+        if key != self.bg_key:
+            return
+        pixmap = BACKGROUNDS.pixmap(key)
+        if pixmap is not None:
+            self.bgLabel.setStyleSheet("")
+            self.bgLabel.setPixmap(pixmap)
+            self.bgLabel.setScaledContents(True)
+
+    def showEvent(self, event):
+        SCORES.load()
+        super().showEvent(event)
+
+    def updateBoard(self, *args):
+        difficulty = self.diffCombo.currentText()
+        if not SCORES.isLoaded():
+            self.boardLabel.setText(f"{difficulty} high scores: loading...")
+            return
+        rows = [f"{i}. {entry['player']} - {entry['score']}" for i, entry in enumerate(SCORES.top(difficulty, BOARD_SIZE), 1)]
+        self.boardLabel.setText(f"{difficulty} high scores\n" + ("\n".join(rows) if rows else "no games yet"))
+
+    def prefetchBackground(self, difficulty):
+        # Warm the game background for the selected difficulty while the menu is open
+        settings = difficultySettings(difficulty)
+        BACKGROUNDS.prefetch(settings["bg_filename"], 400, 550, settings["opacity_level"])
+
     def _resizeEvent(self, event):
         self.bgLabel.setGeometry(0, 0, self.width(), self.height())
         super().resizeEvent(event)
@@ -529,18 +963,14 @@ class SpaceInvaderICT(QtWidgets.QDialog):
     def onStart(self):
         player_name = self.nameLineEdit.text().strip() or "Player"
         diff = self.diffCombo.currentText()
-        self.close()
-        
-        ptr = getMayaWindow()
-        from spaceGame.gameUi import GameWindow 
+        self.hide()
+
         global gameui
-        
-        try:
-            if gameui:
-                gameui.close()
-        except Exception:
-            pass
-            
-        gameui = GameWindow(player_name=player_name, difficulty=diff, parent=ptr)
+        if isAlive(gameui):
+            gameui.reset(diff, player_name)
+        else:
+            ptr = getMayaWindow()
+            gameui = GameWindow(player_name=player_name, difficulty=diff, parent=ptr)
         gameui.show()
-        gameui.setFocus()
\ No newline at end of file
+        gameui.raise_()
+        gameui.setFocus()
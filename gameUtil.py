@@ -1,16 +1,38 @@
-try:
-    from PySide6 import QtCore, QtGui, QtWidgets
-    from shiboken6 import wrapInstance
-except:
-    from PySide2 import QtCore, QtGui, QtWidgets
-    from shiboken2 import wrapInstance
-
-import maya.OpenMayaUI as omui
-import os
+import os, importlib.util
 
 def getMayaWindow():
+    """Maya's main window to parent our dialogs to, or None when running standalone.
+
+    Maya and the shiboken bindings are only imported here, so the package starts without them.
+    """
+    try:
+        import maya.OpenMayaUI as omui
+    except ImportError:
+        return None
     ptr = omui.MQtUtil.mainWindow()
+    if ptr is None:
+        return None
+    try:
+        from PySide6 import QtWidgets
+        from shiboken6 import wrapInstance
+    except ImportError:
+        from PySide2 import QtWidgets
+        from shiboken2 import wrapInstance
     return wrapInstance(int(ptr), QtWidgets.QWidget)
 
+# numpy is by far the slowest import of the package, so it is only imported on first use
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+_numpy = None
+
+def loadNumpy():
+    """The numpy module, imported by the first call; None when it isn't installed."""
+    global _numpy
+    if _numpy is None and HAS_NUMPY:
+        import numpy
+        _numpy = numpy
+    return _numpy
+
 RESOURCES_PATH = os.path.join(os.path.dirname(__file__), "resources").replace("\\", "/")
 DIFFICULT = ["Easy", "Normal", "Hard", "Goddamn"]
+if HAS_NUMPY:
+    DIFFICULT.append("Swarm")
@@ -0,0 +1,12 @@
+import pytest
+
+from spaceGame.gameBullets import EmitterSchedule
+
+def test_zero_delay_is_rejected():
+    with pytest.raises(ValueError):
+        EmitterSchedule([{"hp_below": 1.0, "sequence": [(0, "single")]}])
+
+def test_schedule_fires_on_delay():
+    schedule = EmitterSchedule([{"hp_below": 1.0, "sequence": [(100, "single"), (50, "fan5")]}])
+    assert schedule.advance(90, 1.0) == []
+    assert schedule.advance(60, 1.0) == ["single", "fan5"]
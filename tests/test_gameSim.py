@@ -0,0 +1,51 @@
+"""Headless checks of the simulation; run from the directory above the package: python -m pytest spaceGame/tests"""
+from spaceGame.gameSim import GameWorld
+from spaceGame import gameReplay
+
+def tapWorld():
+    return GameWorld("Normal", "Test", seed=1, player_hp=10 ** 6)
+
+def test_tap_within_one_step_fires():
+    world = tapWorld()
+    world.queueInput("S")
+    world.queueInput("s")
+    world.step()
+    assert len(world.bullets) == 1
+    assert [event for tick, event in world.inputs] == ["S", "s"]
+
+def test_tap_during_cooldown_fires_once_it_ends():
+    world = tapWorld()
+    world.queueInput("S")
+    world.queueInput("s")
+    world.step()
+    world.queueInput("S")
+    world.queueInput("s")
+    world.step()
+    assert world.bullets.high_water == 1
+    for i in range(world.fire_cooldown_ms // world.step_ms + 1):
+        world.step()
+    assert world.bullets.high_water == 2
+
+def test_held_fire_repeats_at_cooldown():
+    world = tapWorld()
+    world.queueInput("S")
+    ticks = 20
+    for i in range(ticks):
+        world.step()
+    assert world.bullets.high_water == -(-ticks * world.step_ms // world.fire_cooldown_ms)
+
+def test_taps_replay_exactly():
+    world = tapWorld()
+    for tick in range(200):
+        if tick % 7 == 0:
+            world.queueInput("S")
+            world.queueInput("s")
+        if tick % 40 == 0:
+            world.queueInput("L" if tick % 80 == 0 else "l")
+        if tick % 11 == 0:
+            # Direct key state, as the bench and farm pilots set it
+            world.fire_held = not world.fire_held
+        world.step()
+    replayed, mismatches = gameReplay.replay(world.recording())
+    assert mismatches == []
+    assert replayed.bullets.high_water == world.bullets.high_water